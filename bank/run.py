@@ -17,14 +17,43 @@ load_dotenv()
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "4000"))
-    # Only watch src directory, exclude venv
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=port,
-        reload=True,
-        reload_dirs=["src"],  # Only watch src directory
-        reload_excludes=["venv/**", "*.pyc", "__pycache__/**"],
-        app_dir="src"
-    )
+    workers = int(os.getenv("WEB_CONCURRENCY", "0"))
+    if workers > 0:
+        # Production: multiple workers on the uvloop + httptools stack
+        # (both ship with uvicorn[standard]); reload is mutually
+        # exclusive with workers, and access logging costs RPS.
+        #
+        # Staleness contract: the in-process caches (wallet/user rows,
+        # /bank-logs pages, the verified-body memo) are per-worker, and
+        # mutation-side invalidation only reaches the worker that handled
+        # the write. With workers > 1 we therefore cap row staleness at
+        # ~2s and never cache misses (a fresh registration must not serve
+        # a 404 from another worker); the verified-body memo simply
+        # misses across workers, costing a re-verification, never
+        # correctness. Funds stay safe regardless: escrow deduction
+        # re-checks atomically in SQL.
+        if workers > 1:
+            os.environ.setdefault("ROW_CACHE_TTL", "2")
+            os.environ.setdefault("ROW_CACHE_NEGATIVE", "0")
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            workers=workers,
+            loop="uvloop",
+            http="httptools",
+            access_log=False,
+            app_dir="src"
+        )
+    else:
+        # Development: single worker, auto-reload on src changes only
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            reload=True,
+            reload_dirs=["src"],  # Only watch src directory
+            reload_excludes=["venv/**", "*.pyc", "__pycache__/**"],
+            app_dir="src"
+        )
 
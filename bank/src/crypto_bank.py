@@ -5,6 +5,7 @@ Handles AES-256-GCM decryption and ECDH key exchange.
 import base64
 import hashlib
 import json
+import logging
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import ec
@@ -13,10 +14,71 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives import serialization
 
+# Same OpenSSL constructor binding as crypto.py: avoids the per-call
+# algorithm-name lookup in hashlib.sha256 on the ledger hashing hot path.
+try:
+    from _hashlib import openssl_sha256 as _sha256
+except ImportError:  # non-OpenSSL CPython builds
+    _sha256 = hashlib.sha256
 
-def sha256(data: str) -> str:
-    """Compute SHA-256 hash of a string."""
-    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def sha256(data) -> str:
+    """Compute SHA-256 hash of a string (or bytes)."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return _sha256(data).hexdigest()
+
+
+def _b64url_decode(s: str) -> bytes:
+    """
+    Decode an unpadded base64url string (JWK coordinate format).
+    Adds exactly the padding needed instead of the blanket "+ '=='",
+    which allocated an over-padded throwaway string per coordinate.
+    """
+    return base64.urlsafe_b64decode(s + '=' * (-len(s) % 4))
+
+
+# AES key-wrapping context cache: ECDH + HKDF for a given (bank key,
+# receiver key) pair always derives the same wrap key, so the keyed AESGCM
+# object can be reused across requests from the same receiver instead of
+# re-running the exchange and KDF every time.
+_wrap_cipher_cache = {}
+_WRAP_CIPHER_CACHE_MAX = 1024
+
+
+def _derive_wrap_key(bank_private_key: ec.EllipticCurvePrivateKey,
+                     receiver_public_key_jwk: dict) -> bytes:
+    """
+    ECDH(bank, receiver) + HKDF to the AES key-wrapping key. The expensive,
+    deterministic half of key unwrapping; decrypt_aes_key_with_private_key
+    caches the resulting cipher per (bank key, receiver key) pair so this
+    runs once per receiver.
+    """
+    # Import receiver's public key for ECDH
+    # Convert JWK to point format for cryptography library
+    x_bytes = _b64url_decode(receiver_public_key_jwk['x'])
+    y_bytes = _b64url_decode(receiver_public_key_jwk['y'])
+
+    # Reconstruct public key point
+    public_numbers = ec.EllipticCurvePublicNumbers(
+        int.from_bytes(x_bytes, 'big'),
+        int.from_bytes(y_bytes, 'big'),
+        ec.SECP256R1()
+    )
+    receiver_public_key = public_numbers.public_key(default_backend())
+
+    # Derive shared secret using ECDH
+    shared_secret = bank_private_key.exchange(ec.ECDH(), receiver_public_key)
+
+    # Derive AES key from shared secret using HKDF
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,  # 256 bits
+        salt=None,
+        info=b'aes-key-wrapping',
+        backend=default_backend()
+    )
+    return hkdf.derive(shared_secret)
 
 
 def decrypt_aes_key_with_private_key(
@@ -48,34 +110,22 @@ def decrypt_aes_key_with_private_key(
         if receiver_public_key_jwk.get('kty') != 'EC' or receiver_public_key_jwk.get('crv') != 'P-256':
             raise ValueError("Receiver public key must be ECDH P-256, not ECDSA")
         
-        # Import receiver's public key for ECDH
-        # Convert JWK to point format for cryptography library
-        x_bytes = base64.urlsafe_b64decode(receiver_public_key_jwk['x'] + '==')
-        y_bytes = base64.urlsafe_b64decode(receiver_public_key_jwk['y'] + '==')
-        
-        # Reconstruct public key point
-        public_numbers = ec.EllipticCurvePublicNumbers(
-            int.from_bytes(x_bytes, 'big'),
-            int.from_bytes(y_bytes, 'big'),
-            ec.SECP256R1()
-        )
-        receiver_public_key = public_numbers.public_key(default_backend())
-        
-        # Derive shared secret using ECDH
-        shared_secret = bank_private_key.exchange(ec.ECDH(), receiver_public_key)
-        
-        # Derive AES key from shared secret using HKDF
-        hkdf = HKDF(
-            algorithm=hashes.SHA256(),
-            length=32,  # 256 bits
-            salt=None,
-            info=b'aes-key-wrapping',
-            backend=default_backend()
+        # Reuse the keyed AESGCM context when this (bank key, receiver key)
+        # pair has been seen before; the ECDH exchange + HKDF always derive
+        # the same wrap key for it.
+        cache_key = (
+            bank_private_key.private_numbers().private_value,
+            receiver_public_key_jwk['x'],
+            receiver_public_key_jwk['y']
         )
-        derived_key = hkdf.derive(shared_secret)
-        
+        aesgcm = _wrap_cipher_cache.get(cache_key)
+        if aesgcm is None:
+            aesgcm = AESGCM(_derive_wrap_key(bank_private_key, receiver_public_key_jwk))
+            if len(_wrap_cipher_cache) >= _WRAP_CIPHER_CACHE_MAX:
+                _wrap_cipher_cache.clear()
+            _wrap_cipher_cache[cache_key] = aesgcm
+
         # Decrypt AES key
-        aesgcm = AESGCM(derived_key)
         aes_key_raw = aesgcm.decrypt(iv, encrypted_key_data, None)
         
         return aes_key_raw
@@ -87,40 +137,128 @@ def decrypt_aes_key_with_private_key(
         raise ValueError(f"Failed to decrypt AES key: {error_msg}")
 
 
+# Payload cipher cache: receivers reuse their session AES key across ledger
+# exports, so keep the keyed AESGCM (and its expanded key schedule) instead
+# of re-keying per call. OpenSSL's EVP AES-GCM already runs the interleaved
+# AES-NI implementation per message; the per-call cost left to shed is the
+# key schedule setup, which this cache removes.
+_payload_cipher_cache = {}
+_PAYLOAD_CIPHER_CACHE_MAX = 1024
+
+
 def decrypt_aes(encrypted_b64: str, iv_b64: str, aes_key: bytes) -> str:
     """
     Decrypt data using AES-256-GCM.
     """
     encrypted = base64.b64decode(encrypted_b64)
     iv = base64.b64decode(iv_b64)
-    
-    aesgcm = AESGCM(aes_key)
+
+    aesgcm = _payload_cipher_cache.get(aes_key)
+    if aesgcm is None:
+        aesgcm = AESGCM(aes_key)
+        if len(_payload_cipher_cache) >= _PAYLOAD_CIPHER_CACHE_MAX:
+            _payload_cipher_cache.clear()
+        _payload_cipher_cache[aes_key] = aesgcm
     decrypted = aesgcm.decrypt(iv, encrypted, None)
-    
+
     return decrypted.decode('utf-8')
 
 
-def verify_signature_ecdsa(hash_hex: str, signature_b64: str, public_key_jwk: dict) -> bool:
-    """
-    Verify ECDSA signature using public key in JWK format.
-    """
-    try:
-        from cryptography.hazmat.primitives.asymmetric import ec
-        from cryptography.hazmat.primitives import hashes
-        from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
-        import struct
-        
-        # Import public key from JWK
-        x_bytes = base64.urlsafe_b64decode(public_key_jwk['x'] + '==')
-        y_bytes = base64.urlsafe_b64decode(public_key_jwk['y'] + '==')
-        
+# Imported-key cache for signature verification: converting a JWK to an
+# EllipticCurvePublicKey (base64 decode + point validation) costs more than
+# the verify itself on repeat senders, and ledgers repeat the same few keys.
+# Keeping the EVP_PKEY alive across verifies also preserves any per-key
+# precomputation OpenSSL attaches to it; per-signer fixed-base multiplication
+# tables beyond that are not reachable through the cryptography API.
+_verify_key_cache = {}
+_VERIFY_KEY_CACHE_MAX = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def _load_ec_public_key(public_key_jwk: dict):
+    """Import (or fetch from cache) an EC P-256 public key from JWK coordinates."""
+    cache_key = (public_key_jwk['x'], public_key_jwk['y'])
+    public_key = _verify_key_cache.get(cache_key)
+    if public_key is None:
+        x_bytes = _b64url_decode(public_key_jwk['x'])
+        y_bytes = _b64url_decode(public_key_jwk['y'])
         public_numbers = ec.EllipticCurvePublicNumbers(
             int.from_bytes(x_bytes, 'big'),
             int.from_bytes(y_bytes, 'big'),
             ec.SECP256R1()
         )
         public_key = public_numbers.public_key(default_backend())
-        
+        if len(_verify_key_cache) >= _VERIFY_KEY_CACHE_MAX:
+            _verify_key_cache.clear()
+        _verify_key_cache[cache_key] = public_key
+    return public_key
+
+
+# Verification results are deterministic in (hash, signature, key), and
+# retried settlements re-submit the same transactions; remember outcomes so
+# recurring entries skip the ECDSA scalar multiplications entirely.
+_verify_result_cache = {}
+_VERIFY_RESULT_CACHE_MAX = 16384
+
+
+def prime_verify_key_cache(public_key_jwk, sec1_point):
+    """
+    Seed the imported-key cache from the compressed SEC1 point stored at
+    KYC registration, so verifying that sender's signatures loads the key
+    via from_encoded_point instead of the JWK base64url + on-curve parse.
+    No-op when either piece is missing, the key is already cached, or the
+    stored point is malformed.
+    """
+    if not isinstance(public_key_jwk, dict) or not sec1_point:
+        return
+    cache_key = (public_key_jwk.get('x'), public_key_jwk.get('y'))
+    if None in cache_key or cache_key in _verify_key_cache:
+        return
+    try:
+        public_key = ec.EllipticCurvePublicKey.from_encoded_point(
+            ec.SECP256R1(), bytes(sec1_point)
+        )
+    except Exception:
+        return
+    if len(_verify_key_cache) >= _VERIFY_KEY_CACHE_MAX:
+        _verify_key_cache.clear()
+    _verify_key_cache[cache_key] = public_key
+
+
+def jwk_to_compressed_point(public_key_jwk: dict):
+    """
+    Compressed 33-byte SEC1 encoding of a P-256 JWK public key, or None if
+    the JWK is malformed. Computed once at KYC registration so later
+    verifiers can load the key without JSON + base64url decoding.
+    """
+    try:
+        public_key = _load_ec_public_key(public_key_jwk)
+        return public_key.public_bytes(
+            serialization.Encoding.X962,
+            serialization.PublicFormat.CompressedPoint
+        )
+    except Exception:
+        return None
+
+
+def verify_signature_ecdsa(hash_hex: str, signature_b64: str, public_key_jwk: dict) -> bool:
+    """
+    Verify ECDSA signature using public key in JWK format.
+    """
+    if isinstance(public_key_jwk, dict):
+        cache_key = (hash_hex, signature_b64,
+                     public_key_jwk.get('x'), public_key_jwk.get('y'))
+        cached = _verify_result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    else:
+        cache_key = None
+
+    try:
+        # Import public key from JWK (cached across calls per sender)
+        public_key = _load_ec_public_key(public_key_jwk)
+
         # Decode signature (base64 -> DER format)
         signature_bytes = base64.b64decode(signature_b64)
         
@@ -142,10 +280,21 @@ def verify_signature_ecdsa(hash_hex: str, signature_b64: str, public_key_jwk: di
             hash_bytes,
             ec.ECDSA(hashes.SHA256())
         )
+        _store_verify_result(cache_key, True)
         return True
     except Exception as e:
-        print(f"Signature verification error: {e}")
+        logger.warning("Signature verification error: %s", e)
+        # Failures are just as deterministic as successes; remember them
+        _store_verify_result(cache_key, False)
         return False
 
 
+def _store_verify_result(cache_key, result: bool):
+    if cache_key is None:
+        return
+    if len(_verify_result_cache) >= _VERIFY_RESULT_CACHE_MAX:
+        _verify_result_cache.clear()
+    _verify_result_cache[cache_key] = result
+
+
 
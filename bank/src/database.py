@@ -3,18 +3,206 @@ Database connection and operations for PostgreSQL audit logs.
 """
 import os
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import pool
+from psycopg2.extras import RealDictCursor, execute_values, Json, register_default_jsonb
+from contextlib import contextmanager
 from typing import List, Optional
 from datetime import datetime
+import csv
+import io
 import json
+import time
+import uuid
+
+# Route JSON params and JSONB results through orjson's C codec when
+# available: details blobs are encoded on every audit insert and decoded on
+# every log fetch. Falls back to the stdlib-backed psycopg2 defaults.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    class _OrJson(Json):
+        """psycopg2 Json adapter backed by orjson."""
+        def dumps(self, obj):
+            return orjson.dumps(obj).decode('utf-8')
+
+    _json_param = _OrJson
+    register_default_jsonb(loads=orjson.loads, globally=True)
+else:
+    _json_param = Json
+
+# The driver stays psycopg2 (pinned in requirements): psycopg3's binary
+# protocol + pipeline mode would subsume the execute_values batching below,
+# but it is a different dependency with its own pool class, and everything
+# in this module leans on psycopg2 semantics. Revisit as one coordinated
+# migration rather than piecemeal.
+#
+# Process-wide connection pool, created lazily on first use. Opening a fresh
+# TCP connection (and TLS/auth handshake) per query dominated DB call latency.
+_connection_pool = None
+
+
+def _get_pool():
+    global _connection_pool
+    if _connection_pool is None:
+        database_url = os.getenv('DATABASE_URL')
+        if not database_url:
+            raise ValueError("DATABASE_URL environment variable not set")
+        _connection_pool = pool.ThreadedConnectionPool(
+            minconn=1,
+            maxconn=int(os.getenv('DB_POOL_MAX', '10')),
+            dsn=database_url
+        )
+    return _connection_pool
 
 
 def get_db_connection():
-    """Get PostgreSQL connection from DATABASE_URL environment variable."""
+    """Borrow a PostgreSQL connection from the process-wide pool."""
+    return _get_pool().getconn()
+
+
+def put_db_connection(conn):
+    """Return a connection to the pool (use instead of conn.close())."""
+    _get_pool().putconn(conn)
+
+
+def create_listen_connection(channel: str):
+    """
+    Open a dedicated, non-pooled autocommit connection LISTENing on the
+    given channel. Long-lived LISTEN consumers (the wallet-status
+    dispatcher) must not park a pool slot for their lifetime.
+    """
     database_url = os.getenv('DATABASE_URL')
     if not database_url:
         raise ValueError("DATABASE_URL environment variable not set")
-    return psycopg2.connect(database_url)
+    conn = psycopg2.connect(database_url)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("LISTEN " + channel)
+    return conn
+
+
+@contextmanager
+def get_conn(autocommit: bool = False):
+    """
+    Borrow a pooled connection for the duration of a with-block.
+
+    Read-only callers pass autocommit=True to skip the implicit
+    BEGIN/COMMIT framing psycopg2 wraps around every statement - one
+    fewer round-trip per read. The flag is reset before the connection
+    goes back to the pool.
+    """
+    conn = _get_pool().getconn()
+    try:
+        if autocommit:
+            conn.autocommit = True
+        yield conn
+    finally:
+        # A connection-fatal error mid-block marks the connection closed;
+        # resetting autocommit on it raises InterfaceError, which would
+        # mask the original exception and skip putconn - leaking the pool
+        # slot for good. putconn itself discards closed connections.
+        if autocommit and not conn.closed:
+            conn.autocommit = False
+        _get_pool().putconn(conn)
+
+
+@contextmanager
+def _conn_or_pool(conn, autocommit: bool = False):
+    """
+    Yield the caller-supplied connection, or borrow one from the pool when
+    None. Lets request handlers thread a single connection through several
+    helper calls instead of checking one out per call.
+    """
+    if conn is not None:
+        yield conn
+    else:
+        with get_conn(autocommit=autocommit) as pooled:
+            yield pooled
+
+
+# Server-side prepared statements for the single-row lookups hit in the
+# settlement loop. psycopg2 never prepares automatically (every execute
+# re-parses and re-plans on the server), so each pooled connection runs
+# PREPARE once on first borrow and the helpers below EXECUTE by name.
+_PREPARED_STATEMENTS = (
+    """
+    PREPARE bank_check_settled (text) AS
+    SELECT EXISTS (
+        SELECT 1 FROM audit_logs
+        WHERE txn_id = $1 AND action = 'settle' AND status = 'success'
+    )
+    """,
+    """
+    PREPARE bank_get_wallet (uuid) AS
+    SELECT
+        wallet_id::text,
+        user_id::text,
+        approved_limit,
+        current_balance,
+        used_amount,
+        locked_amount,
+        status,
+        created_at::text,
+        updated_at::text
+    FROM wallets
+    WHERE wallet_id = $1
+    """,
+    """
+    PREPARE bank_get_user (uuid) AS
+    SELECT
+        user_id::text,
+        full_name,
+        email_or_phone,
+        role,
+        bank_id,
+        kyc_status,
+        created_at::text,
+        updated_at::text
+    FROM users
+    WHERE user_id = $1
+    """,
+    """
+    PREPARE bank_wallet_sufficient (uuid, numeric) AS
+    SELECT EXISTS (
+        SELECT 1 FROM wallets
+        WHERE wallet_id = $1 AND status = 'approved' AND current_balance >= $2
+    )
+    """,
+)
+
+
+def _uuid7() -> str:
+    """
+    Time-ordered UUIDv7 (RFC 9562) generated application-side: random v4
+    primary keys scatter B-tree inserts across pages, while v7's leading
+    millisecond timestamp keeps new rows in the rightmost page. No uuid7
+    dependency needed - the layout is 48 bits of timestamp plus version,
+    variant, and randomness.
+    """
+    ts_ms = time.time_ns() // 1_000_000
+    rand = os.urandom(10)
+    raw = (
+        ts_ms.to_bytes(6, 'big')
+        + bytes((0x70 | (rand[0] & 0x0F), rand[1], 0x80 | (rand[2] & 0x3F)))
+        + rand[3:]
+    )
+    return str(uuid.UUID(bytes=raw))
+
+
+def ensure_prepared(conn):
+    """Prepare the hot statements once per pooled connection."""
+    if getattr(conn, '_bank_prepared', False):
+        return
+    with conn.cursor() as cur:
+        for stmt in _PREPARED_STATEMENTS:
+            cur.execute(stmt)
+    # Commit so the PREPAREs survive a later rollback on this connection
+    # (prepared statements are session-scoped but transactional until then).
+    conn.commit()
+    conn._bank_prepared = True
 
 
 def write_audit_log(
@@ -28,35 +216,138 @@ def write_audit_log(
     Write audit log to PostgreSQL.
     Returns the log ID (UUID).
     """
-    conn = get_db_connection()
-    try:
+    with get_conn() as conn:
         with conn.cursor() as cur:
+            # Audit logs are advisory: async commit skips the WAL flush wait
+            # (a crash can lose the last few entries, never corrupt them).
+            cur.execute("SET LOCAL synchronous_commit TO OFF")
             cur.execute(
                 """
                 INSERT INTO audit_logs (actor, action, txn_id, status, details)
                 VALUES (%s, %s, %s, %s, %s)
                 RETURNING id::text
                 """,
-                (actor, action, txn_id, status, json.dumps(details))
+                (actor, action, txn_id, status, _json_param(details))
             )
             log_id = cur.fetchone()[0]
             conn.commit()
+            _audit_logs_cache.clear()
             return log_id
-    finally:
-        conn.close()
 
 
-def get_audit_logs(limit: int = 100, offset: int = 0) -> List[dict]:
+def write_audit_logs_batch(logs: List[dict], conn=None) -> List[str]:
     """
-    Retrieve audit logs from PostgreSQL.
-    Returns list of log dictionaries.
+    Write multiple audit logs in a single round-trip via execute_values.
+    Each dict needs actor, action, status, details and may carry txn_id.
+    Returns the log IDs (UUIDs) in insertion order.
     """
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+    if not logs:
+        return []
+    owned = conn is None
+    with _conn_or_pool(conn) as conn:
+        with conn.cursor() as cur:
+            if owned:
+                # Only soften commits we own: on a caller's settlement
+                # transaction the final commit also covers financial rows.
+                cur.execute("SET LOCAL synchronous_commit TO OFF")
+            rows = execute_values(
+                cur,
+                """
+                INSERT INTO audit_logs (actor, action, txn_id, status, details)
+                VALUES %s
+                RETURNING id::text
+                """,
+                [
+                    (
+                        log['actor'],
+                        log['action'],
+                        log.get('txn_id'),
+                        log['status'],
+                        _json_param(log['details'])
+                    )
+                    for log in logs
+                ],
+                fetch=True
+            )
+            if owned:
+                conn.commit()
+                _audit_logs_cache.clear()
+            return [row[0] for row in rows]
+
+
+def bulk_write_audit_logs(logs: List[dict], conn=None) -> List[str]:
+    """
+    Ingest a large batch of audit logs via COPY FROM STDIN (CSV), the
+    fast path past per-row parameter parsing. COPY cannot RETURNING, so
+    ids are generated client-side and streamed in the CSV. For small
+    batches write_audit_logs_batch is cheaper; callers pick by size.
+    Returns the log IDs in insertion order.
+    """
+    if not logs:
+        return []
+    ids = [_uuid7() for _ in logs]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for log_id, log in zip(ids, logs):
+        details = log['details']
+        if orjson is not None:
+            details_json = orjson.dumps(details).decode('utf-8')
+        else:
+            details_json = json.dumps(details)
+        writer.writerow([
+            log_id,
+            log['actor'],
+            log['action'],
+            log.get('txn_id'),
+            log['status'],
+            details_json
+        ])
+    buf.seek(0)
+    owned = conn is None
+    with _conn_or_pool(conn) as conn:
+        with conn.cursor() as cur:
+            if owned:
+                cur.execute("SET LOCAL synchronous_commit TO OFF")
+            cur.copy_expert(
+                """
+                COPY audit_logs (id, actor, action, txn_id, status, details)
+                FROM STDIN WITH (FORMAT csv, NULL '')
+                """,
+                buf
+            )
+            if owned:
+                conn.commit()
+                _audit_logs_cache.clear()
+            return ids
+
+
+def iter_audit_logs(limit: int = 100, offset: int = 0, batch_size: int = 500,
+                    cursor: Optional[str] = None):
+    """
+    Stream audit logs from PostgreSQL via a named server-side cursor.
+    Yields row dicts in batches of batch_size instead of materializing the
+    whole result set client-side; large exports never hold more than one
+    batch in memory.
+
+    When a keyset cursor ("created_at|log_id" from the previous page's
+    last row) is given, pagination seeks with a composite
+    (created_at, id) < (ts, id) comparison instead of paying O(offset)
+    rows of OFFSET skip. The id tiebreaker matters here: batch settlement
+    inserts give a whole ledger's logs the identical NOW(), so a
+    timestamp-only cursor would drop the rest of a batch that straddles a
+    page boundary. A bare-timestamp cursor (older clients) still works,
+    with ties broken below the max UUID.
+    """
+    cursor_ts = cursor
+    cursor_id = 'ffffffff-ffff-ffff-ffff-ffffffffffff'
+    if cursor is not None and '|' in cursor:
+        cursor_ts, cursor_id = cursor.rsplit('|', 1)
+    with get_conn() as conn:
+        with conn.cursor(name='audit_stream', cursor_factory=RealDictCursor) as cur:
+            cur.itersize = batch_size
             cur.execute(
                 """
-                SELECT 
+                SELECT
                     id::text as log_id,
                     actor,
                     action,
@@ -65,66 +356,288 @@ def get_audit_logs(limit: int = 100, offset: int = 0) -> List[dict]:
                     details,
                     created_at::text as timestamp
                 FROM audit_logs
-                ORDER BY created_at DESC
+                WHERE (%s::timestamptz IS NULL
+                       OR (created_at, id) < (%s::timestamptz, %s::uuid))
+                ORDER BY created_at DESC, id DESC
                 LIMIT %s OFFSET %s
                 """,
-                (limit, offset)
+                (cursor_ts, cursor_ts, cursor_id, limit,
+                 offset if cursor is None else 0)
             )
-            logs = cur.fetchall()
-            return [dict(log) for log in logs]
-    finally:
-        conn.close()
+            # RealDictCursor rows already are dicts; no per-row rewrap needed
+            for row in cur:
+                yield row
+
+
+# Short-TTL cache for the log-tailing endpoint: polling UIs issue identical
+# (limit, offset) reads many times a second. Kept in-process rather than in
+# Redis - the service runs as a single uvicorn process and carries no Redis
+# dependency - and invalidated wholesale on every audit write.
+_audit_logs_cache = {}
+_AUDIT_LOGS_CACHE_TTL = 2.0
+# The key includes the client-controlled cursor string, so cap the cache
+# like the others: a client sweeping cursors must not grow it unbounded
+# between the write-driven clears.
+_AUDIT_LOGS_CACHE_MAX = 256
 
 
-def check_transaction_settled(txn_id: str) -> bool:
+def get_audit_logs(limit: int = 100, offset: int = 0,
+                   cursor: Optional[str] = None) -> List[dict]:
+    """
+    Retrieve audit logs from PostgreSQL.
+    Returns list of log dictionaries (cached for a couple of seconds).
+    """
+    key = (limit, offset, cursor)
+    cached = _audit_logs_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _AUDIT_LOGS_CACHE_TTL:
+        return cached[1]
+    logs = list(iter_audit_logs(limit=limit, offset=offset, cursor=cursor))
+    if len(_audit_logs_cache) >= _AUDIT_LOGS_CACHE_MAX:
+        _audit_logs_cache.clear()
+    _audit_logs_cache[key] = (time.monotonic(), logs)
+    return logs
+
+
+# Settled-txn lookup cache. A settled transaction can never become
+# unsettled, so positive results are safe to remember for the life of the
+# process. Negative results are never cached: the txn may settle at any
+# moment (including via another worker), and a stale False would weaken the
+# replay check. Cleared wholesale if it ever grows past the cap.
+_settled_txn_cache = set()
+_SETTLED_TXN_CACHE_MAX = 100_000
+
+
+def check_transaction_settled(txn_id: str, conn=None) -> bool:
     """
     Check if a transaction has already been settled.
     Returns True if transaction exists in audit logs with action='settle'.
     """
-    conn = get_db_connection()
-    try:
+    if txn_id in _settled_txn_cache:
+        return True
+    with _conn_or_pool(conn, autocommit=True) as conn:
+        ensure_prepared(conn)
+        with conn.cursor() as cur:
+            # EXISTS stops at the first matching row instead of counting all
+            # settle logs for the txn; prepared server-side so repeat calls
+            # skip parse + plan.
+            cur.execute("EXECUTE bank_check_settled (%s)", (txn_id,))
+            settled = cur.fetchone()[0]
+            if settled:
+                if len(_settled_txn_cache) >= _SETTLED_TXN_CACHE_MAX:
+                    _settled_txn_cache.clear()
+                _settled_txn_cache.add(txn_id)
+            return settled
+
+
+def get_already_settled(txn_ids: List[str], conn=None) -> set:
+    """
+    Return the subset of txn_ids that already have a successful settle log.
+    One ANY(%s) round-trip replaces N check_transaction_settled calls in
+    the settlement loop.
+    """
+    if not txn_ids:
+        return set()
+    # Serve known positives from the in-process cache, query only the rest.
+    cached = {t for t in txn_ids if t in _settled_txn_cache}
+    remaining = [t for t in txn_ids if t not in cached]
+    if not remaining:
+        return cached
+    with _conn_or_pool(conn, autocommit=True) as conn:
         with conn.cursor() as cur:
             cur.execute(
                 """
-                SELECT COUNT(*) FROM audit_logs
-                WHERE txn_id = %s AND action = 'settle' AND status = 'success'
+                SELECT DISTINCT txn_id FROM audit_logs
+                WHERE txn_id = ANY(%s) AND action = 'settle' AND status = 'success'
                 """,
-                (txn_id,)
+                (remaining,)
             )
-            count = cur.fetchone()[0]
-            return count > 0
-    finally:
-        conn.close()
+            settled = {row[0] for row in cur.fetchall()}
+    if settled:
+        if len(_settled_txn_cache) + len(settled) > _SETTLED_TXN_CACHE_MAX:
+            _settled_txn_cache.clear()
+        _settled_txn_cache.update(settled)
+    return cached | settled
+
+
+# Wallet/user read cache: these rows change rarely relative to how often a
+# settlement re-reads them. In-process (same reasoning as the audit-log
+# cache: no Redis dependency), cleared wholesale by every mutating helper -
+# but that invalidation is per-process, so multi-worker deployments
+# (run.py's WEB_CONCURRENCY mode) shorten the TTL via ROW_CACHE_TTL and
+# disable negative caching via ROW_CACHE_NEGATIVE=0 to bound cross-worker
+# staleness. The settlement escrow check stays safe regardless: the SQL
+# deduction re-checks atomically in its WHERE clause.
+_row_cache = {}
+_ROW_CACHE_TTL = float(os.getenv('ROW_CACHE_TTL', '30'))
+_ROW_CACHE_NEGATIVE = os.getenv('ROW_CACHE_NEGATIVE', '1') != '0'
+# Capped like every other cache in this module: the keys are arbitrary ids
+# probed through unauthenticated GETs (including misses), so an uncapped
+# dict would grow one entry per random UUID an attacker sweeps.
+_ROW_CACHE_MAX = 10_000
+
+
+def _row_cache_get(key):
+    entry = _row_cache.get(key)
+    if entry is not None and time.monotonic() - entry[0] < _ROW_CACHE_TTL:
+        return entry
+    return None
+
+
+def _row_cache_put(key, value):
+    if value is None and not _ROW_CACHE_NEGATIVE:
+        # A cached miss served after another worker created the row is a
+        # spurious 404; skip negative entries when workers > 1.
+        return
+    if len(_row_cache) >= _ROW_CACHE_MAX:
+        _row_cache.clear()
+    _row_cache[key] = (time.monotonic(), value)
+
+
+def commit_settlement(conn):
+    """
+    Commit a caller-managed settlement transaction and invalidate the
+    cached wallet/user rows (and audit-log pages) the batch just wrote;
+    the helpers called with this connection defer their own commits and
+    cache clears to this point.
+    """
+    conn.commit()
+    _row_cache.clear()
+    _audit_logs_cache.clear()
+
+
+def get_wallets_bulk(wallet_ids: List[str], conn=None) -> dict:
+    """
+    Fetch several wallets in one ANY() query for the settlement loop.
+    Returns {wallet_id: row dict}; ids that are absent or not valid UUIDs
+    are simply missing from the result. Serves and feeds the row cache.
+    """
+    result = {}
+    remaining = []
+    for wallet_id in set(wallet_ids):
+        if not wallet_id:
+            continue
+        cached = _row_cache_get(('wallet', wallet_id))
+        if cached is not None:
+            if cached[1] is not None:
+                result[wallet_id] = cached[1]
+            continue
+        try:
+            uuid.UUID(str(wallet_id))
+        except (ValueError, AttributeError, TypeError):
+            continue
+        remaining.append(wallet_id)
+    if remaining:
+        with _conn_or_pool(conn, autocommit=True) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    """
+                    SELECT
+                        wallet_id::text,
+                        user_id::text,
+                        approved_limit,
+                        current_balance,
+                        used_amount,
+                        locked_amount,
+                        status,
+                        created_at::text,
+                        updated_at::text
+                    FROM wallets
+                    WHERE wallet_id = ANY(%s::uuid[])
+                    """,
+                    (remaining,)
+                )
+                for row in cur.fetchall():
+                    wallet = dict(row)
+                    result[wallet['wallet_id']] = wallet
+                    _row_cache_put(('wallet', wallet['wallet_id']), wallet)
+    return result
+
+
+def get_users_by_bank_ids(bank_id_roles: List[tuple], conn=None) -> dict:
+    """
+    Fetch users for several (bank_id, role) pairs in one query.
+    Returns {(bank_id, role): row dict}; unknown pairs are missing.
+    Rows carry the registered public_key_jwk and the precomputed
+    public_key_sec1 point so the settlement loop can seed the signature
+    verifier's key cache.
+    """
+    result = {}
+    remaining = []
+    for pair in set(bank_id_roles):
+        bank_id, role = pair
+        if not bank_id:
+            continue
+        cached = _row_cache_get(('user_by_bank', bank_id, role))
+        if cached is not None:
+            if cached[1] is not None:
+                result[pair] = cached[1]
+            continue
+        remaining.append(pair)
+    if remaining:
+        with _conn_or_pool(conn, autocommit=True) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    """
+                    SELECT
+                        user_id::text,
+                        full_name,
+                        email_or_phone,
+                        role,
+                        bank_id,
+                        kyc_status,
+                        public_key_jwk,
+                        public_key_sec1,
+                        created_at::text,
+                        updated_at::text
+                    FROM users
+                    WHERE (bank_id, role) IN %s
+                    """,
+                    (tuple(remaining),)
+                )
+                for row in cur.fetchall():
+                    user = dict(row)
+                    pair = (user['bank_id'], user['role'])
+                    result[pair] = user
+                    _row_cache_put(('user_by_bank', user['bank_id'], user['role']), user)
+    return result
 
 
 # User/KYC Functions
-def create_user(full_name: str, email_or_phone: str, role: str, bank_id: str, public_key_jwk: dict) -> str:
-    """Create a new user with KYC registration. Returns user_id."""
+def create_user(full_name: str, email_or_phone: str, role: str, bank_id: str, public_key_jwk: dict,
+                public_key_sec1: Optional[bytes] = None) -> str:
+    """
+    Create a new user with KYC registration. Returns user_id.
+    public_key_sec1 is the caller-precomputed compressed SEC1 point for the
+    JWK, stored so verifiers can skip the JSON/base64url decode later.
+    """
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
+            # Id generated client-side (UUIDv7): no RETURNING parse, and
+            # time-ordered keys insert at the right edge of the PK B-tree
+            user_id = _uuid7()
             cur.execute(
                 """
-                INSERT INTO users (full_name, email_or_phone, role, bank_id, public_key_jwk, kyc_status)
-                VALUES (%s, %s, %s, %s, %s, 'pending')
-                RETURNING user_id::text
+                INSERT INTO users (user_id, full_name, email_or_phone, role, bank_id, public_key_jwk, public_key_sec1, kyc_status)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, 'pending')
                 """,
-                (full_name, email_or_phone, role, bank_id, json.dumps(public_key_jwk))
+                (user_id, full_name, email_or_phone, role, bank_id,
+                 _json_param(public_key_jwk),
+                 psycopg2.Binary(public_key_sec1) if public_key_sec1 else None)
             )
-            user_id = cur.fetchone()[0]
             conn.commit()
+            _row_cache.clear()
             return user_id
     except psycopg2.IntegrityError as e:
         conn.rollback()
         raise ValueError(f"User already exists: {str(e)}")
     finally:
-        conn.close()
+        put_db_connection(conn)
 
 
 def update_user_kyc_status(user_id: str, kyc_status: str) -> bool:
     """Update user KYC status. Returns True if successful."""
-    conn = get_db_connection()
-    try:
+    with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 """
@@ -136,42 +649,31 @@ def update_user_kyc_status(user_id: str, kyc_status: str) -> bool:
             )
             updated = cur.rowcount > 0
             conn.commit()
+            _row_cache.clear()
             return updated
-    finally:
-        conn.close()
 
 
-def get_user(user_id: str) -> Optional[dict]:
+def get_user(user_id: str, conn=None) -> Optional[dict]:
     """Get user by user_id. Returns None if not found."""
-    conn = get_db_connection()
-    try:
+    cached = _row_cache_get(('user', user_id))
+    if cached is not None:
+        return cached[1]
+    with _conn_or_pool(conn, autocommit=True) as conn:
+        ensure_prepared(conn)
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                """
-                SELECT 
-                    user_id::text,
-                    full_name,
-                    email_or_phone,
-                    role,
-                    bank_id,
-                    kyc_status,
-                    created_at::text,
-                    updated_at::text
-                FROM users
-                WHERE user_id = %s
-                """,
-                (user_id,)
-            )
+            cur.execute("EXECUTE bank_get_user (%s)", (user_id,))
             row = cur.fetchone()
-            return dict(row) if row else None
-    finally:
-        conn.close()
+            result = dict(row) if row else None
+    _row_cache_put(('user', user_id), result)
+    return result
 
 
-def get_user_by_bank_id(bank_id: str, role: str) -> Optional[dict]:
+def get_user_by_bank_id(bank_id: str, role: str, conn=None) -> Optional[dict]:
     """Get user by bank_id and role. Returns None if not found."""
-    conn = get_db_connection()
-    try:
+    cached = _row_cache_get(('user_by_bank', bank_id, role))
+    if cached is not None:
+        return cached[1]
+    with _conn_or_pool(conn, autocommit=True) as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 """
@@ -190,54 +692,81 @@ def get_user_by_bank_id(bank_id: str, role: str) -> Optional[dict]:
                 (bank_id, role)
             )
             row = cur.fetchone()
-            return dict(row) if row else None
-    finally:
-        conn.close()
+            result = dict(row) if row else None
+    _row_cache_put(('user_by_bank', bank_id, role), result)
+    return result
 
 
 def get_all_users(kyc_status: Optional[str] = None) -> List[dict]:
     """Get all users, optionally filtered by kyc_status."""
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            if kyc_status:
-                cur.execute(
-                    """
-                    SELECT 
-                        user_id::text,
-                        full_name,
-                        email_or_phone,
-                        role,
-                        bank_id,
-                        kyc_status,
-                        created_at::text,
-                        updated_at::text
-                    FROM users
-                    WHERE kyc_status = %s
-                    ORDER BY created_at DESC
-                    """,
-                    (kyc_status,)
-                )
-            else:
-                cur.execute(
-                    """
-                    SELECT 
+    with get_conn(autocommit=True) as conn:
+        with conn.cursor() as cur:
+            # One NULL-coalescing query instead of two near-identical
+            # branches (single cached plan), aggregated server-side with
+            # json_agg: one text blob + one orjson parse replaces N
+            # RealDictRow materializations and N*k small allocations.
+            cur.execute(
+                """
+                SELECT COALESCE(json_agg(t), '[]'::json)::text FROM (
+                    SELECT
                         user_id::text,
                         full_name,
                         email_or_phone,
                         role,
                         bank_id,
                         kyc_status,
-                        created_at::text,
-                        updated_at::text
+                        created_at::text
                     FROM users
+                    WHERE (%s::text IS NULL OR kyc_status = %s)
                     ORDER BY created_at DESC
-                    """
-                )
-            rows = cur.fetchall()
-            return [dict(row) for row in rows]
-    finally:
-        conn.close()
+                ) t
+                """,
+                (kyc_status, kyc_status)
+            )
+            blob = cur.fetchone()[0]
+            return orjson.loads(blob) if orjson is not None else json.loads(blob)
+
+
+def get_all_users_with_wallets(kyc_status: Optional[str] = None) -> List[dict]:
+    """
+    Users joined with their wallet (if any) in one query, for callers that
+    would otherwise follow the user list with a /wallets/user/{id} call per
+    row. Same json_agg single-parse shape as get_all_users, with the wallet
+    nested as an object (or null).
+    """
+    with get_conn(autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT COALESCE(json_agg(t), '[]'::json)::text FROM (
+                    SELECT
+                        u.user_id::text,
+                        u.full_name,
+                        u.email_or_phone,
+                        u.role,
+                        u.bank_id,
+                        u.kyc_status,
+                        u.created_at::text,
+                        CASE WHEN w.wallet_id IS NULL THEN NULL ELSE
+                            json_build_object(
+                                'wallet_id', w.wallet_id::text,
+                                'approved_limit', w.approved_limit,
+                                'current_balance', w.current_balance,
+                                'used_amount', w.used_amount,
+                                'locked_amount', w.locked_amount,
+                                'status', w.status
+                            )
+                        END AS wallet
+                    FROM users u
+                    LEFT JOIN wallets w ON w.user_id = u.user_id
+                    WHERE (%s::text IS NULL OR u.kyc_status = %s)
+                    ORDER BY u.created_at DESC
+                ) t
+                """,
+                (kyc_status, kyc_status)
+            )
+            blob = cur.fetchone()[0]
+            return orjson.loads(blob) if orjson is not None else json.loads(blob)
 
 
 # Wallet Functions
@@ -246,28 +775,27 @@ def create_wallet(user_id: str, requested_limit: float) -> str:
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
+            wallet_id = _uuid7()
             cur.execute(
                 """
-                INSERT INTO wallets (user_id, approved_limit, current_balance, status)
-                VALUES (%s, %s, %s, 'pending')
-                RETURNING wallet_id::text
+                INSERT INTO wallets (wallet_id, user_id, approved_limit, current_balance, status)
+                VALUES (%s, %s, %s, %s, 'pending')
                 """,
-                (user_id, requested_limit, requested_limit)  # Initially set balance to requested limit
+                (wallet_id, user_id, requested_limit, requested_limit)  # Initially set balance to requested limit
             )
-            wallet_id = cur.fetchone()[0]
             conn.commit()
+            _row_cache.clear()
             return wallet_id
     except psycopg2.IntegrityError as e:
         conn.rollback()
         raise ValueError(f"Wallet already exists for user: {str(e)}")
     finally:
-        conn.close()
+        put_db_connection(conn)
 
 
 def approve_wallet(wallet_id: str, approved_limit: float) -> bool:
     """Approve wallet and lock the amount. Returns True if successful."""
-    conn = get_db_connection()
-    try:
+    with get_conn() as conn:
         with conn.cursor() as cur:
             # Update wallet status and lock the amount
             cur.execute(
@@ -284,43 +812,68 @@ def approve_wallet(wallet_id: str, approved_limit: float) -> bool:
             )
             updated = cur.rowcount > 0
             conn.commit()
+            _row_cache.clear()
             return updated
-    finally:
-        conn.close()
 
 
-def get_wallet(wallet_id: str) -> Optional[dict]:
-    """Get wallet by wallet_id. Returns None if not found."""
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+def set_wallet_decision(wallet_id: str, status: str,
+                        approved_limit: Optional[float] = None) -> bool:
+    """
+    Approve or reject a wallet in one atomic UPDATE: approval sets the
+    limit, balance, and escrow together; rejection just flips the status.
+    Returns False when the wallet doesn't exist - callers no longer need a
+    get_wallet pre-read for the 404 case.
+    """
+    with get_conn() as conn:
+        with conn.cursor() as cur:
             cur.execute(
                 """
-                SELECT 
-                    wallet_id::text,
-                    user_id::text,
-                    approved_limit,
-                    current_balance,
-                    used_amount,
-                    locked_amount,
-                    status,
-                    created_at::text,
-                    updated_at::text
-                FROM wallets
+                UPDATE wallets
+                SET status = %s,
+                    approved_limit = COALESCE(%s, approved_limit),
+                    current_balance = COALESCE(%s, current_balance),
+                    locked_amount = COALESCE(%s, locked_amount),
+                    updated_at = NOW()
                 WHERE wallet_id = %s
+                RETURNING wallet_id
                 """,
-                (wallet_id,)
+                (status, approved_limit, approved_limit, approved_limit, wallet_id)
             )
+            updated = cur.fetchone() is not None
+            if updated:
+                # Push the transition to /wallets/subscribe listeners so
+                # clients stop polling for pending->approved; delivered
+                # with the commit (NOTIFY is transactional).
+                cur.execute(
+                    "SELECT pg_notify('wallet_status', %s)",
+                    (json.dumps({'wallet_id': wallet_id, 'status': status}),)
+                )
+            conn.commit()
+            _row_cache.clear()
+            return updated
+
+
+def get_wallet(wallet_id: str, conn=None) -> Optional[dict]:
+    """Get wallet by wallet_id. Returns None if not found."""
+    cached = _row_cache_get(('wallet', wallet_id))
+    if cached is not None:
+        return cached[1]
+    with _conn_or_pool(conn, autocommit=True) as conn:
+        ensure_prepared(conn)
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("EXECUTE bank_get_wallet (%s)", (wallet_id,))
             row = cur.fetchone()
-            return dict(row) if row else None
-    finally:
-        conn.close()
+            result = dict(row) if row else None
+    _row_cache_put(('wallet', wallet_id), result)
+    return result
 
 
 def get_wallet_by_user_id(user_id: str) -> Optional[dict]:
     """Get wallet by user_id. Returns None if not found."""
-    conn = get_db_connection()
-    try:
+    cached = _row_cache_get(('wallet_by_user', user_id))
+    if cached is not None:
+        return cached[1]
+    with get_conn(autocommit=True) as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 """
@@ -340,57 +893,54 @@ def get_wallet_by_user_id(user_id: str) -> Optional[dict]:
                 (user_id,)
             )
             row = cur.fetchone()
-            return dict(row) if row else None
-    finally:
-        conn.close()
+            result = dict(row) if row else None
+    _row_cache_put(('wallet_by_user', user_id), result)
+    return result
 
 
-def update_wallet_balance(wallet_id: str, amount: float) -> bool:
-    """Deduct amount from wallet balance and add to used_amount. Returns True if successful."""
-    conn = get_db_connection()
-    try:
+def update_wallet_balance(wallet_id: str, amount: float, conn=None) -> bool:
+    """
+    Deduct amount from wallet balance and add to used_amount. Returns True
+    if successful. As with settle_transaction_to_wallet, a caller-supplied
+    conn keeps ownership of commit/rollback.
+    """
+    owned = conn is None
+    with _conn_or_pool(conn) as conn:
         with conn.cursor() as cur:
-            # Check current balance
-            cur.execute(
-                """
-                SELECT current_balance, approved_limit
-                FROM wallets
-                WHERE wallet_id = %s AND status = 'approved'
-                """,
-                (wallet_id,)
-            )
-            row = cur.fetchone()
-            if not row:
-                return False
-            current_balance, approved_limit = row
-            
-            # Check if sufficient balance
-            if current_balance < amount:
-                return False
-            
-            # Update balance
+            # Single atomic UPDATE: the balance guard lives in the WHERE
+            # clause, so there is no read-then-write race window and one
+            # round-trip instead of two.
             cur.execute(
                 """
                 UPDATE wallets
                 SET current_balance = current_balance - %s,
                     used_amount = used_amount + %s,
                     updated_at = NOW()
-                WHERE wallet_id = %s AND current_balance >= %s
+                WHERE wallet_id = %s AND status = 'approved' AND current_balance >= %s
+                RETURNING wallet_id
                 """,
                 (amount, amount, wallet_id, amount)
             )
-            updated = cur.rowcount > 0
-            conn.commit()
+            updated = cur.fetchone() is not None
+            if owned:
+                conn.commit()
+                _row_cache.clear()
             return updated
-    finally:
-        conn.close()
 
 
 def settle_transaction_to_wallet(txn_id: str, wallet_id: str, from_user_id: str, to_user_id: str, 
                                   amount: float, ledger_index: Optional[int] = None, 
-                                  receiver_id: Optional[str] = None) -> str:
-    """Record a settled transaction and deduct from wallet locked amount. Returns settlement ID."""
-    conn = get_db_connection()
+                                  receiver_id: Optional[str] = None, conn=None) -> str:
+    """
+    Record a settled transaction and deduct from wallet locked amount.
+    Returns settlement ID. With a caller-supplied conn, commit/rollback are
+    left to the caller (settle_ledger batches entries under savepoints in
+    one transaction); errors are raised with the transaction state intact
+    so the caller can ROLLBACK TO its savepoint.
+    """
+    owned = conn is None
+    if owned:
+        conn = get_db_connection()
     try:
         with conn.cursor() as cur:
             # Insert into settled_transactions
@@ -405,43 +955,46 @@ def settle_transaction_to_wallet(txn_id: str, wallet_id: str, from_user_id: str,
             )
             settlement_id = cur.fetchone()[0]
             
-            # Deduct from locked_amount (escrow)
+            # Deduct from locked_amount (escrow); the guards live in the
+            # WHERE clause, so an insufficient escrow - or a wallet whose
+            # status changed since the (possibly cached) pre-check read it -
+            # aborts the settlement insert instead of silently no-opping.
             cur.execute(
                 """
                 UPDATE wallets
                 SET locked_amount = locked_amount - %s,
                     updated_at = NOW()
-                WHERE wallet_id = %s AND locked_amount >= %s
+                WHERE wallet_id = %s AND status = 'approved' AND locked_amount >= %s
                 """,
                 (amount, wallet_id, amount)
             )
-            
-            conn.commit()
+            if cur.rowcount == 0:
+                if owned:
+                    conn.rollback()
+                raise ValueError(
+                    f"Wallet {wallet_id} not approved or insufficient locked amount "
+                    f"for transaction {txn_id}"
+                )
+
+            if owned:
+                conn.commit()
+                _row_cache.clear()
             return settlement_id
     except psycopg2.IntegrityError:
-        conn.rollback()
+        if owned:
+            conn.rollback()
         raise ValueError(f"Transaction {txn_id} already settled")
     finally:
-        conn.close()
+        if owned:
+            put_db_connection(conn)
 
 
 def check_wallet_balance_sufficient(wallet_id: str, amount: float) -> bool:
     """Check if wallet has sufficient balance. Returns True if sufficient."""
-    conn = get_db_connection()
-    try:
+    with get_conn(autocommit=True) as conn:
+        ensure_prepared(conn)
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT current_balance
-                FROM wallets
-                WHERE wallet_id = %s AND status = 'approved'
-                """,
-                (wallet_id,)
-            )
-            row = cur.fetchone()
-            if not row:
-                return False
-            current_balance = float(row[0])
-            return current_balance >= amount
-    finally:
-        conn.close()
+            # EXISTS with the comparison server-side: no row transfer, no
+            # client float conversion, single index probe.
+            cur.execute("EXECUTE bank_wallet_sufficient (%s, %s)", (wallet_id, amount))
+            return cur.fetchone()[0]
@@ -4,18 +4,23 @@ Generates and stores bank's ECDH keypair.
 """
 import os
 import json
+from functools import lru_cache
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
 
 
+@lru_cache(maxsize=1)
 def get_or_create_bank_keypair():
     """
     Get or create bank's ECDH keypair for decryption.
     Returns private key (EllipticCurvePrivateKey).
+
+    Memoized: PEM + ASN.1 parsing is expensive and this runs on every
+    encrypted-ledger request, so the disk read happens once per process.
     """
     key_file = os.path.join(os.path.dirname(__file__), '..', 'bank_keys.json')
-    
+
     if os.path.exists(key_file):
         with open(key_file, 'r') as f:
             key_data = json.load(f)
@@ -56,20 +61,34 @@ def get_or_create_bank_keypair():
         'ext': True
     }
     
-    # Save keys
-    with open(key_file, 'w') as f:
+    # Save keys; exclusive create so racing workers can't clobber each
+    # other's freshly generated key
+    try:
+        fd = os.open(key_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    except FileExistsError:
+        # Another worker won the race; load and use its key
+        with open(key_file, 'r') as f:
+            key_data = json.load(f)
+            return serialization.load_pem_private_key(
+                key_data['private_key'].encode(),
+                password=None,
+                backend=default_backend()
+            )
+    with os.fdopen(fd, 'w') as f:
         json.dump({
             'private_key': private_key_pem,
             'public_key_pem': public_key_pem,
             'public_key_jwk': public_key_jwk
         }, f, indent=2)
-    
+
     return private_key
 
 
+@lru_cache(maxsize=1)
 def get_bank_public_key_jwk():
     """
     Get bank's public key in JWK format for sharing with Receiver.
+    Memoized alongside the keypair; the JWK never changes in-process.
     """
     key_file = os.path.join(os.path.dirname(__file__), '..', 'bank_keys.json')
     
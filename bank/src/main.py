@@ -2,69 +2,188 @@
 FastAPI backend service for offline payment settlement.
 Handles ledger verification and transaction settlement.
 """
+import asyncio
+import hashlib
+import logging
+import logging.handlers
 import os
 import json
-from fastapi import FastAPI, HTTPException, Request
+import queue
+import select
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
-from typing import Union, List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional
+
+# orjson parses large ledger bodies in one C pass, roughly halving request
+# parse time vs the stdlib decoder behind Request.json()
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from models import (
-    LedgerVerificationRequest,
-    LedgerVerificationResponse,
-    SettlementRequest,
-    SettlementResponse,
-    Ledger,
-    LedgerEntry,
-    LogEntry,
     KYCRegistrationRequest,
     KYCRegistrationResponse,
     KYCApprovalRequest,
-    UserResponse,
     WalletRequest,
     WalletRequestResponse,
-    WalletApprovalRequest,
-    WalletResponse
+    WalletApprovalRequest
 )
-from crypto import verify_hash_chain, check_duplicate_transactions, compute_transaction_hash
+from crypto import verify_entries, compute_transaction_hash, hash_equal
 from crypto_bank import (
     decrypt_aes_key_with_private_key,
     decrypt_aes,
     verify_signature_ecdsa,
+    jwk_to_compressed_point,
+    prime_verify_key_cache,
     sha256
 )
 from key_manager import get_or_create_bank_keypair, get_bank_public_key_jwk
 from database import (
-    write_audit_log, get_audit_logs, check_transaction_settled,
+    get_conn, ensure_prepared, create_listen_connection,
+    write_audit_log, write_audit_logs_batch, bulk_write_audit_logs,
+    get_audit_logs, get_already_settled,
+    get_wallets_bulk, get_users_by_bank_ids, commit_settlement,
     create_user, update_user_kyc_status, get_user, get_user_by_bank_id, get_all_users,
-    create_wallet, approve_wallet, get_wallet, get_wallet_by_user_id,
-    update_wallet_balance, settle_transaction_to_wallet, check_wallet_balance_sufficient
+    get_all_users_with_wallets,
+    create_wallet, set_wallet_decision, get_wallet, get_wallet_by_user_id,
+    settle_transaction_to_wallet
 )
 
 # Load environment variables
 load_dotenv()
 
+# Log records pass through an in-memory queue to a background listener
+# thread: stdout/stderr writes take a process-wide lock, and a blocked
+# stream must never stall a request thread.
+logger = logging.getLogger("bank")
+_log_queue: queue.Queue = queue.Queue(maxsize=10000)
+_log_listener = None
+
+
+def _setup_logging():
+    global _log_listener
+    if _log_listener is not None:
+        return
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    _log_listener = logging.handlers.QueueListener(_log_queue, stream_handler)
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(_log_queue))
+    root.setLevel(logging.INFO)
+    _log_listener.start()
+
+
+_setup_logging()
+
+# Fire-and-forget audit logging: advisory endpoint-outcome logs shouldn't
+# cost the request a DB round-trip before the response goes out. Records are
+# enqueued here and a daemon thread flushes them in batches (the request
+# pipelines run on the threadpool, so a plain queue.Queue is the right
+# primitive rather than an asyncio.Queue).
+_audit_queue: queue.Queue = queue.Queue(maxsize=10000)
+_AUDIT_FLUSH_BATCH = 1000
+
+
+def queue_audit_log(actor: str, action: str, status: str, details: dict, txn_id=None):
+    """Enqueue an advisory audit log for background flushing."""
+    record = {
+        "actor": actor,
+        "action": action,
+        "status": status,
+        "details": details,
+        "txn_id": txn_id
+    }
+    try:
+        _audit_queue.put_nowait(record)
+    except queue.Full:
+        # Backpressure: write inline rather than dropping the record
+        try:
+            write_audit_log(actor=actor, action=action, status=status,
+                            details=details, txn_id=txn_id)
+        except Exception as log_err:
+            logger.warning("Failed to write audit log: %s", log_err)
+
+
+def _audit_flush_loop():
+    """Drain the audit queue in batches until the shutdown sentinel arrives."""
+    shutting_down = False
+    while not shutting_down:
+        batch = [_audit_queue.get()]
+        while len(batch) < _AUDIT_FLUSH_BATCH:
+            try:
+                batch.append(_audit_queue.get_nowait())
+            except queue.Empty:
+                break
+        if None in batch:
+            shutting_down = True
+            batch = [record for record in batch if record is not None]
+        if batch:
+            try:
+                write_audit_logs_batch(batch)
+            except Exception as flush_err:
+                logger.warning("Failed to flush audit logs: %s", flush_err)
+
+# Verified-ledger memo: clients call /verify-ledger then /settle-ledger
+# back-to-back with the same body, which re-ran the whole chain walk and
+# signature pass. Remember recent fully-clean verifications by body digest
+# so settlement can skip the re-verification. In-process (single worker),
+# so unlike a shared Redis hint no HMAC is needed - nothing outside this
+# process can write to it.
+_verified_cache = {}
+_VERIFIED_CACHE_TTL = 60.0
+_VERIFIED_CACHE_MAX = 256
+
+
+def _mark_verified(body_digest):
+    if body_digest is None:
+        return
+    if len(_verified_cache) >= _VERIFIED_CACHE_MAX:
+        _verified_cache.clear()
+    _verified_cache[body_digest] = time.monotonic()
+
+
+def _was_verified(body_digest) -> bool:
+    if body_digest is None:
+        return False
+    ts = _verified_cache.get(body_digest)
+    return ts is not None and time.monotonic() - ts < _VERIFIED_CACHE_TTL
+
+
 app = FastAPI(
     title="Offline Payment Bank Service",
     description="Backend service for verifying and settling offline payment ledgers",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes large log/ledger responses several times faster
+    # than the stdlib encoder behind the default JSONResponse
+    default_response_class=ORJSONResponse
 )
 
-# CORS middleware to allow frontend access
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@app.on_event("startup")
+async def _warm_bank_keys():
+    # The keypair helpers are lru_cached; priming them here moves the disk
+    # read + PEM/ASN.1 parse to startup instead of the first encrypted
+    # request (and surfaces key-file problems at boot).
+    get_or_create_bank_keypair()
+    get_bank_public_key_jwk()
 
 
-@app.get("/")
-async def root():
-    """Health check endpoint."""
-    return {
+@app.on_event("startup")
+async def _preserialize_static_responses():
+    # These payloads never change in-process; serving pre-encoded bytes
+    # turns load-balancer health-check storms into a memcpy instead of a
+    # jsonable_encoder + dumps per hit.
+    encode = orjson.dumps if orjson is not None else (lambda o: json.dumps(o).encode())
+    app.state.root_bytes = encode({
         "service": "Offline Payment Bank Service",
         "status": "running",
         "endpoints": {
@@ -75,7 +194,54 @@ async def root():
             "kyc": "/kyc/register, /kyc/approve, /kyc/users",
             "wallets": "/wallets/request, /wallets/approve, /wallets/{wallet_id}"
         }
-    }
+    })
+    app.state.bank_pub_bytes = encode({
+        "public_key": get_bank_public_key_jwk(),
+        "format": "JWK",
+        "algorithm": "ECDH P-256",
+        "usage": "Import this key in Receiver app to enable ledger encryption"
+    })
+
+
+@app.on_event("startup")
+async def _start_audit_flusher():
+    app.state.audit_flusher = threading.Thread(
+        target=_audit_flush_loop, name="audit-flusher", daemon=True
+    )
+    app.state.audit_flusher.start()
+
+
+@app.on_event("shutdown")
+async def _drain_audit_queue():
+    # Sentinel wakes the flusher, which drains everything queued before it
+    _audit_queue.put(None)
+    app.state.audit_flusher.join(timeout=5)
+
+
+# CORS middleware to allow frontend access. Origins come from CORS_ORIGINS
+# (comma-separated); the wildcard default keeps dev behavior, while a
+# concrete list puts the middleware on its exact-match fast path instead of
+# reflecting headers per request. Methods/headers are pinned to what the
+# sender/receiver/admin frontends actually use.
+# JSON arrays repeat every field name per row; gzip collapses that
+# redundancy 5-10x on user lists and large ledger responses. Small bodies
+# skip compression. (HTTP/2 negotiation lives in the reverse proxy.)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
+cors_origins = [o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",") if o.strip()]
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=cors_origins,
+    allow_credentials=True,
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+)
+
+
+@app.get("/")
+async def root():
+    """Health check endpoint (served from bytes pre-encoded at startup)."""
+    return Response(app.state.root_bytes, media_type="application/json")
 
 
 @app.get("/bank-public-key")
@@ -83,34 +249,142 @@ async def get_bank_public_key():
     """
     Get bank's public key in JWK format.
     Receiver needs this to encrypt ledgers for the bank.
+    The JWK never changes in-process, so the response bytes are
+    pre-encoded at startup.
     """
-    try:
-        public_key_jwk = get_bank_public_key_jwk()
-        return {
-            "public_key": public_key_jwk,
-            "format": "JWK",
-            "algorithm": "ECDH P-256",
-            "usage": "Import this key in Receiver app to enable ledger encryption"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get public key: {str(e)}")
+    return Response(app.state.bank_pub_bytes, media_type="application/json")
+
+
+# Cap and stream request bodies: request.body() buffers the whole POST with
+# no limit, so a hostile or runaway client could balloon memory before the
+# parse even starts. Reading the ASGI stream ourselves keeps one buffer and
+# rejects oversized ledgers early.
+_MAX_BODY_BYTES = int(os.getenv('MAX_LEDGER_BODY_BYTES', str(8 * 1024 * 1024)))
+
+
+async def _read_json_body(request: Request) -> bytes:
+    """Read the request body incrementally, rejecting oversized payloads."""
+    buf = bytearray()
+    async for chunk in request.stream():
+        buf.extend(chunk)
+        if len(buf) > _MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Request body too large")
+    return bytes(buf)
+
+
+def _verification_response(valid: bool, errors: List[str],
+                           verified_transactions: List[str]) -> ORJSONResponse:
+    """Emit the /verify-ledger body directly, skipping response-model
+    re-validation of data this service just computed."""
+    return ORJSONResponse({
+        "valid": valid,
+        "errors": errors,
+        "verified_transactions": verified_transactions
+    })
+
+
+def _wallet_payload(wallet: dict) -> dict:
+    """
+    Response dict for a wallet row fetched from our own schema: the
+    NUMERIC columns become floats once here instead of through a full
+    WalletResponse validation pass per request.
+    """
+    payload = dict(wallet)
+    for field in ('approved_limit', 'current_balance', 'used_amount', 'locked_amount'):
+        value = payload.get(field)
+        if value is not None:
+            payload[field] = float(value)
+    return payload
 
 
-async def decrypt_encrypted_ledger(encrypted_data: dict) -> tuple[List[Dict], str]:
+def _settlement_response(settled: bool, settled_transactions: List[str],
+                         errors: List[str], audit_log_ids: List[str]) -> ORJSONResponse:
+    """Emit the /settle-ledger body directly (same reasoning as above)."""
+    return ORJSONResponse({
+        "settled": settled,
+        "settled_transactions": settled_transactions,
+        "errors": errors,
+        "audit_log_ids": audit_log_ids
+    })
+
+
+# Per-entry sender-signature checks are independent and OpenSSL's verify
+# releases the GIL, so signature-heavy ledgers fan out across a thread
+# pool; small batches stay inline to avoid dispatch overhead. The executor
+# is module-level and reused - spawning and joining a fresh pool per
+# request would pay thread startup on exactly the hot path this shaves.
+_SIG_PARALLEL_THRESHOLD = 64
+_sig_executor = ThreadPoolExecutor(
+    max_workers=min(os.cpu_count() or 1, 8),
+    thread_name_prefix="sig-verify"
+)
+
+
+def _check_entry_signatures(entries):
+    """
+    Transaction-hash and sender-signature checks for every entry, shared
+    by the verify and settle pipelines. Returns (errors, hash_error_count,
+    sig_error_count, missing_count) - the counts spare callers from
+    re-classifying the error strings afterwards.
+    """
+    errors = []
+    sig_items = []
+    hash_error_count = 0
+    missing_count = 0
+    for i, entry in enumerate(entries):
+        txn = entry.get('transaction', {})
+        if not txn:
+            errors.append(f"Entry {i}: Missing transaction data")
+            missing_count += 1
+            continue
+
+        # Verify transaction hash (constant-time compare)
+        computed_hash = compute_transaction_hash(txn)
+        if not hash_equal(computed_hash, txn.get('hash')):
+            errors.append(f"Entry {i}: Transaction hash mismatch")
+            hash_error_count += 1
+
+        # Collect sender signature for (possibly parallel) verification
+        sender_pub_key = txn.get('sender_public_key')
+        signature = txn.get('signature')
+        if sender_pub_key and signature:
+            sig_items.append((i, txn.get('hash', ''), signature, sender_pub_key))
+
+    if len(sig_items) >= _SIG_PARALLEL_THRESHOLD:
+        results = list(_sig_executor.map(
+            lambda item: verify_signature_ecdsa(item[1], item[2], item[3]),
+            sig_items
+        ))
+    else:
+        results = [
+            verify_signature_ecdsa(hash_hex, signature, pub_key)
+            for _, hash_hex, signature, pub_key in sig_items
+        ]
+    sig_error_count = 0
+    for (i, _, _, _), sig_valid in zip(sig_items, results):
+        if not sig_valid:
+            errors.append(f"Entry {i}: Sender signature invalid")
+            sig_error_count += 1
+    return errors, hash_error_count, sig_error_count, missing_count
+
+
+# Built once; dict.keys() set-difference replaces four sequential
+# membership checks + per-field error strings in the decrypt entry point.
+_REQUIRED_ENCRYPTED_FIELDS = frozenset(
+    {'encrypted_aes_key', 'receiver_public_key', 'encrypted_payload', 'iv'}
+)
+
+
+def decrypt_encrypted_ledger(encrypted_data: dict) -> tuple[List[Dict], str]:
     """
     Decrypt encrypted ledger data.
     Returns (entries, receiver_id).
     """
     try:
-        # Validate required fields
-        if 'encrypted_aes_key' not in encrypted_data:
-            raise ValueError("Missing encrypted_aes_key field")
-        if 'receiver_public_key' not in encrypted_data:
-            raise ValueError("Missing receiver_public_key field (ECDH public key)")
-        if 'encrypted_payload' not in encrypted_data:
-            raise ValueError("Missing encrypted_payload field")
-        if 'iv' not in encrypted_data:
-            raise ValueError("Missing iv field")
+        # Validate required fields in one set difference
+        missing = _REQUIRED_ENCRYPTED_FIELDS - encrypted_data.keys()
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(sorted(missing))}")
         
         # Step 1: Decrypt AES key using Bank private key (ECDH)
         # receiver_public_key should be Receiver's ECDH public key
@@ -132,15 +406,35 @@ async def decrypt_encrypted_ledger(encrypted_data: dict) -> tuple[List[Dict], st
                 encrypted_data['iv'],
                 aes_key_bytes
             )
-            signed_data = json.loads(decrypted_payload)
+            if orjson is not None:
+                signed_data = orjson.loads(decrypted_payload)
+            else:
+                signed_data = json.loads(decrypted_payload)
         except Exception as payload_err:
             raise ValueError(f"Failed to decrypt payload: {str(payload_err)}")
         
-        # Step 3: Verify Receiver signature
-        ledger_json = json.dumps(signed_data['ledger'], separators=(',', ':'))
-        expected_hash = sha256(ledger_json)
+        # Step 3: Verify Receiver signature. Exports that carry the
+        # canonical ledger JSON as a raw string (ledger_canonical) get the
+        # zero-reencode path: hash the received bytes directly and parse
+        # entries from the same buffer. Older payloads re-encode the parsed
+        # ledger with orjson - one compact C pass whose bytes feed the
+        # hasher directly.
+        canonical = signed_data.get('ledger_canonical')
+        if isinstance(canonical, str):
+            canonical_bytes = canonical.encode('utf-8')
+            expected_hash = sha256(canonical_bytes)
+            if orjson is not None:
+                signed_data['ledger'] = orjson.loads(canonical_bytes)
+            else:
+                signed_data['ledger'] = json.loads(canonical)
+        else:
+            if orjson is not None:
+                ledger_json = orjson.dumps(signed_data['ledger'])
+            else:
+                ledger_json = json.dumps(signed_data['ledger'], separators=(',', ':'))
+            expected_hash = sha256(ledger_json)
         
-        if expected_hash != signed_data['hash']:
+        if not hash_equal(expected_hash, signed_data.get('hash')):
             raise ValueError("Ledger hash mismatch after decryption")
         
         receiver_public_key_jwk = signed_data.get('receiver_public_key', encrypted_data.get('receiver_public_key'))
@@ -171,60 +465,54 @@ def parse_ledger_data(data: Any) -> tuple[List[Dict], str]:
     - Wrapped: {"ledger": {receiver_id: "...", entries: [...], ...}}
     """
     receiver_id = "unknown"
-    entries = []
-    
-    # Handle encrypted format
-    if isinstance(data, dict) and 'encrypted_payload' in data:
-        # This is encrypted - will be handled by caller
-        raise ValueError("Encrypted data detected - use decrypt_encrypted_ledger")
-    
-    # Handle direct array (most common - as exported by receiver)
-    if isinstance(data, list):
-        entries = data
-        return entries, receiver_id
-    
-    # Handle dict
-    if isinstance(data, dict):
-        # Check if it's a wrapped ledger object
-        if 'ledger' in data and isinstance(data['ledger'], dict):
-            ledger_dict = data['ledger']
+
+    # Direct array first (most common - as exported by receiver); nothing
+    # to validate or convert, return as-is. Exact type checks: the parsers
+    # only ever hand over plain list/dict, and `type is` skips the mro walk.
+    if type(data) is list:
+        return data, receiver_id
+
+    if type(data) is dict:
+        # Encrypted format is the caller's job
+        if 'encrypted_payload' in data:
+            raise ValueError("Encrypted data detected - use decrypt_encrypted_ledger")
+
+        # Wrapped ledger object
+        ledger_dict = data.get('ledger')
+        if isinstance(ledger_dict, dict):
             receiver_id = ledger_dict.get('receiver_id', 'unknown')
             entries = ledger_dict.get('entries', [])
             # Convert Pydantic models to dicts if needed
-            if entries and hasattr(entries[0], 'dict'):
-                entries = [e.dict() if hasattr(e, 'dict') else e for e in entries]
+            if entries and hasattr(entries[0], 'model_dump'):
+                entries = [e.model_dump(mode='python') if hasattr(e, 'model_dump') else e for e in entries]
             return entries, receiver_id
-        
-        # Check if it's a direct ledger entry (single entry)
+
+        # Direct ledger entry (single entry)
         if 'ledger_index' in data and 'transaction' in data:
-            entries = [data]
-            return entries, receiver_id
-        
-        # Try parsing as LedgerVerificationRequest/SettlementRequest
-        try:
-            if 'ledger' in data:
-                req = LedgerVerificationRequest(**data)
-            else:
-                # Assume it's a ledger dict directly
-                ledger = Ledger(**data)
-                receiver_id = ledger.receiver_id
-                entries = [e.dict() for e in ledger.entries]
-                return entries, receiver_id
-        except:
-            pass
-    
-    # Handle Pydantic models
+            return [data], receiver_id
+
+        # Bare ledger dict (receiver_id + entries at top level). Explicit
+        # key check instead of the old Ledger(**data) fallback: the chain
+        # walk validates entries anyway, so Pydantic re-validation here
+        # only built throwaway models.
+        if 'receiver_id' in data and 'entries' in data:
+            entries = data.get('entries') or []
+            if entries and hasattr(entries[0], 'model_dump'):
+                entries = [e.model_dump(mode='python') if hasattr(e, 'model_dump') else e for e in entries]
+            return entries, data.get('receiver_id', 'unknown')
+
+    # Pydantic request models (already validated upstream)
     if hasattr(data, 'ledger'):
         ledger = data.ledger
         receiver_id = ledger.receiver_id
-        entries = [e.dict() for e in ledger.entries]
+        entries = [e.model_dump(mode='python') for e in ledger.entries]
         return entries, receiver_id
-    
+
     raise ValueError("Unable to parse ledger data format")
 
 
-@app.post("/verify-ledger", response_model=LedgerVerificationResponse)
-async def verify_ledger(request: Request):
+@app.post("/verify-ledger")
+async def verify_ledger(request: Request, fail_fast: bool = False):
     """
     Verify ledger integrity:
     - Decrypts encrypted ledger if provided
@@ -232,31 +520,56 @@ async def verify_ledger(request: Request):
     - Hash chain validation
     - Transaction signature verification
     - Duplicate transaction detection
-    
+
     Accepts JSON body as:
     - Encrypted: {"encrypted_payload": "...", "encrypted_aes_key": "...", "iv": "...", "receiver_public_key": {...}}
     - Direct array: [{"ledger_index": 0, "transaction": {...}, "hash": "...", "status": "..."}, ...]
     - Wrapped: {"ledger": {"receiver_id": "...", "entries": [...], "exported_at": "..."}}
     """
+    try:
+        body = await _read_json_body(request)
+        data = orjson.loads(body) if orjson is not None else json.loads(body)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return _verify_ledger_impl_error(f"Verification error: {str(e)}")
+    # The pipeline is CPU (hashing, ECDSA) and blocking DB work; run it on
+    # the threadpool so it doesn't stall the event loop.
+    return await run_in_threadpool(
+        _verify_ledger_impl, data, hashlib.sha256(body).hexdigest(), fail_fast
+    )
+
+
+def _verify_ledger_impl_error(error_msg: str):
+    """Audit-log an endpoint-level verification failure and raise the 500."""
+    queue_audit_log(
+        actor="bank",
+        action="verify_ledger",
+        status="error",
+        details={"error": error_msg}
+    )
+    raise HTTPException(status_code=500, detail=error_msg)
+
+
+def _verify_ledger_impl(data, body_digest=None, fail_fast=False) -> ORJSONResponse:
+    """Synchronous verification pipeline shared by the endpoint wrapper."""
     errors = []
     verified_txn_ids = []
-    
+
     try:
-        data = await request.json()
-        
         # Check if data is encrypted
         if isinstance(data, dict) and 'encrypted_payload' in data:
             # Decrypt first
             try:
-                entries, receiver_id = await decrypt_encrypted_ledger(data)
-                write_audit_log(
+                entries, receiver_id = decrypt_encrypted_ledger(data)
+                queue_audit_log(
                     actor="bank",
                     action="decrypt_ledger",
                     status="success",
                     details={"message": "Ledger decrypted successfully"}
                 )
             except Exception as decrypt_err:
-                return LedgerVerificationResponse(
+                return _verification_response(
                     valid=False,
                     errors=[f"Decryption failed: {str(decrypt_err)}"],
                     verified_transactions=[]
@@ -266,91 +579,74 @@ async def verify_ledger(request: Request):
             entries, receiver_id = parse_ledger_data(data)
         
         if not entries:
-            return LedgerVerificationResponse(
+            return _verification_response(
                 valid=False,
                 errors=["Ledger is empty"],
                 verified_transactions=[]
             )
         
-        # Verify hash chain integrity
-        chain_valid, chain_errors = verify_hash_chain(entries)
+        # Fused pass: chain linkage, txn hashes, and duplicate ids in one
+        # walk over the entries. Callers that only need a verdict pass
+        # fail_fast=1: the walk stops at the first error and the signature
+        # pass is skipped entirely, saving O(N) ECDSA verifies on ledgers
+        # that are already invalid.
+        chain_valid, chain_errors, duplicates = verify_entries(
+            entries, max_errors=1 if fail_fast else None
+        )
         if not chain_valid:
             errors.extend(chain_errors)
-        
-        # Verify individual transaction signatures
-        for i, entry in enumerate(entries):
-            txn = entry.get('transaction', {})
-            if not txn:
-                errors.append(f"Entry {i}: Missing transaction data")
-                continue
-            
-            # Verify transaction hash
-            computed_hash = compute_transaction_hash(txn)
-            if computed_hash != txn.get('hash'):
-                errors.append(f"Entry {i}: Transaction hash mismatch")
-            
-            # Verify sender signature
-            sender_pub_key = txn.get('sender_public_key')
-            signature = txn.get('signature')
-            if sender_pub_key and signature:
-                sig_valid = verify_signature_ecdsa(
-                    txn.get('hash', ''),
-                    signature,
-                    sender_pub_key
+            if fail_fast:
+                return _verification_response(
+                    valid=False,
+                    errors=errors,
+                    verified_transactions=[]
                 )
-                if not sig_valid:
-                    errors.append(f"Entry {i}: Sender signature invalid")
         
-        # Check for duplicate transactions
-        no_duplicates, duplicates = check_duplicate_transactions(entries)
+        # Verify individual transaction signatures (signature-only errors
+        # deliberately do not block the verified-id listing below)
+        entry_errors, hash_errs, _sig_errs, missing_errs = _check_entry_signatures(entries)
+        errors.extend(entry_errors)
+        
+        no_duplicates = not duplicates
         if not no_duplicates:
             errors.append(f"Duplicate transactions found: {', '.join(duplicates)}")
         
-        # Collect verified transaction IDs
-        if chain_valid and no_duplicates and len([e for e in errors if 'signature' not in e.lower()]) == 0:
+        # Collect verified transaction IDs. Counts from the check pass
+        # replace the old re-scan of every error string.
+        if chain_valid and no_duplicates and not hash_errs and not missing_errs:
             verified_txn_ids = [
                 entry['transaction']['txn_id'] for entry in entries
             ]
         
-        # Log verification attempt
-        try:
-            write_audit_log(
-                actor="bank",
-                action="verify_ledger",
-                status="success" if len(errors) == 0 else "failed",
-                details={
-                    "receiver_id": receiver_id,
-                    "entry_count": len(entries),
-                    "errors": errors,
-                    "verified_count": len(verified_txn_ids)
-                }
-            )
-        except Exception as db_err:
-            # Don't fail verification if logging fails, but note it
-            print(f"Failed to write audit log: {db_err}")
+        # Log verification attempt (flushed in the background)
+        queue_audit_log(
+            actor="bank",
+            action="verify_ledger",
+            status="success" if len(errors) == 0 else "failed",
+            details={
+                "receiver_id": receiver_id,
+                "entry_count": len(entries),
+                "errors": errors,
+                "verified_count": len(verified_txn_ids)
+            }
+        )
         
-        return LedgerVerificationResponse(
+        if len(errors) == 0:
+            _mark_verified(body_digest)
+
+        return _verification_response(
             valid=len(errors) == 0,
             errors=errors,
             verified_transactions=verified_txn_ids
         )
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
-        error_msg = f"Verification error: {str(e)}"
-        try:
-            write_audit_log(
-                actor="bank",
-                action="verify_ledger",
-                status="error",
-                details={"error": error_msg}
-            )
-        except:
-            pass
-        
-        raise HTTPException(status_code=500, detail=error_msg)
+        _verify_ledger_impl_error(f"Verification error: {str(e)}")
 
 
-@app.post("/settle-ledger", response_model=SettlementResponse)
+@app.post("/settle-ledger")
 async def settle_ledger(request: Request):
     """
     Settle verified transactions:
@@ -359,32 +655,55 @@ async def settle_ledger(request: Request):
     - Re-verify ledger integrity
     - Check for already-settled transactions
     - Write settlement audit logs
-    
+
     Accepts JSON body as:
     - Encrypted: {"encrypted_payload": "...", "encrypted_aes_key": "...", "iv": "...", "receiver_public_key": {...}}
     - Direct array: [{"ledger_index": 0, "transaction": {...}, "hash": "...", "status": "..."}, ...]
     - Wrapped: {"ledger": {"receiver_id": "...", "entries": [...], "exported_at": "..."}}
     """
+    try:
+        body = await _read_json_body(request)
+        data = orjson.loads(body) if orjson is not None else json.loads(body)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return _settle_ledger_impl_error(f"Settlement error: {str(e)}")
+    # Same threadpool treatment as verify: settlement is hashing plus a
+    # series of blocking DB round-trips.
+    return await run_in_threadpool(
+        _settle_ledger_impl, data, hashlib.sha256(body).hexdigest()
+    )
+
+
+def _settle_ledger_impl_error(error_msg: str):
+    """Audit-log an endpoint-level settlement failure and raise the 500."""
+    queue_audit_log(
+        actor="bank",
+        action="settle_ledger",
+        status="error",
+        details={"error": error_msg}
+    )
+    raise HTTPException(status_code=500, detail=error_msg)
+
+
+def _settle_ledger_impl(data, body_digest=None) -> ORJSONResponse:
+    """Synchronous settlement pipeline shared by the endpoint wrapper."""
     errors = []
-    settled_txn_ids = []
-    audit_log_ids = []
-    
+
     try:
-        data = await request.json()
-        
         # Check if data is encrypted
         if isinstance(data, dict) and 'encrypted_payload' in data:
             # Decrypt first
             try:
-                entries, receiver_id = await decrypt_encrypted_ledger(data)
-                write_audit_log(
+                entries, receiver_id = decrypt_encrypted_ledger(data)
+                queue_audit_log(
                     actor="bank",
                     action="decrypt_ledger",
                     status="success",
                     details={"message": "Ledger decrypted successfully"}
                 )
             except Exception as decrypt_err:
-                return SettlementResponse(
+                return _settlement_response(
                     settled=False,
                     settled_transactions=[],
                     errors=[f"Decryption failed: {str(decrypt_err)}"],
@@ -395,19 +714,28 @@ async def settle_ledger(request: Request):
             entries, receiver_id = parse_ledger_data(data)
         
         if not entries:
-            return SettlementResponse(
+            return _settlement_response(
                 settled=False,
                 settled_transactions=[],
                 errors=["Ledger is empty"],
                 audit_log_ids=[]
             )
-        
-        # Verify hash chain
-        chain_valid, chain_errors = verify_hash_chain(entries)
+
+        if _was_verified(body_digest):
+            # This exact body passed full verification moments ago (the
+            # usual verify-then-settle pairing); skip straight to the
+            # settlement loop instead of re-running the chain walk,
+            # signature pass, and duplicate scan.
+            with get_conn() as conn:
+                ensure_prepared(conn)
+                return _settle_entries(entries, receiver_id, errors, conn)
+
+        # Fused chain + duplicate pass (one walk over the entries)
+        chain_valid, chain_errors, duplicates = verify_entries(entries)
         if not chain_valid:
             errors.extend(chain_errors)
             errors.append("Ledger verification failed. Cannot settle.")
-            return SettlementResponse(
+            return _settlement_response(
                 settled=False,
                 settled_transactions=[],
                 errors=errors,
@@ -415,57 +743,86 @@ async def settle_ledger(request: Request):
             )
         
         # Verify individual transaction signatures
-        for i, entry in enumerate(entries):
-            txn = entry.get('transaction', {})
-            if not txn:
-                errors.append(f"Entry {i}: Missing transaction data")
-                continue
-            
-            # Verify transaction hash
-            computed_hash = compute_transaction_hash(txn)
-            if computed_hash != txn.get('hash'):
-                errors.append(f"Entry {i}: Transaction hash mismatch")
-            
-            # Verify sender signature
-            sender_pub_key = txn.get('sender_public_key')
-            signature = txn.get('signature')
-            if sender_pub_key and signature:
-                sig_valid = verify_signature_ecdsa(
-                    txn.get('hash', ''),
-                    signature,
-                    sender_pub_key
-                )
-                if not sig_valid:
-                    errors.append(f"Entry {i}: Sender signature invalid")
+        entry_errors, hash_errs, sig_errs, missing_errs = _check_entry_signatures(entries)
+        errors.extend(entry_errors)
         
-        # Check duplicates
-        no_duplicates, duplicates = check_duplicate_transactions(entries)
-        if not no_duplicates:
+        # Duplicates came from the fused pass above
+        if duplicates:
             errors.append(f"Duplicate transactions found: {', '.join(duplicates)}")
-            return SettlementResponse(
+            return _settlement_response(
                 settled=False,
                 settled_transactions=[],
                 errors=errors,
                 audit_log_ids=[]
             )
         
-        # If signature errors, don't settle
-        signature_errors = [e for e in errors if 'signature' in e.lower() or 'hash mismatch' in e.lower()]
-        if signature_errors:
-            return SettlementResponse(
+        # If signature or hash errors, don't settle (counts from the check
+        # pass; the chain walk already early-returned on structural errors)
+        if sig_errs or hash_errs:
+            return _settlement_response(
                 settled=False,
                 settled_transactions=[],
                 errors=errors,
                 audit_log_ids=[]
             )
         
-        # Process each transaction
+        # One pooled connection serves the whole settlement: the bulk
+        # settled lookup, every per-txn wallet/user query, and the final
+        # log flush, instead of a pool checkout per helper call.
+        with get_conn() as conn:
+            ensure_prepared(conn)
+            return _settle_entries(entries, receiver_id, errors, conn)
+
+    except HTTPException:
+        # _settle_entries already audit-logged and converted its failure;
+        # re-wrapping would double both the detail prefix and the log.
+        raise
+    except Exception as e:
+        _settle_ledger_impl_error(f"Settlement error: {str(e)}")
+
+
+def _settle_entries(entries, receiver_id, errors, conn) -> ORJSONResponse:
+    """Run the settlement loop for verified entries on one shared connection."""
+    settled_txn_ids = []
+    audit_log_ids = []
+    try:
+        # One bulk lookup replaces the per-transaction settled check
+        already_settled = get_already_settled(
+            [entry['transaction']['txn_id'] for entry in entries],
+            conn=conn
+        )
+
+        # Prefetch every wallet and user the loop will touch: three ANY()
+        # queries instead of three round-trips per transaction.
+        wallets_by_id = get_wallets_bulk(
+            [entry['transaction'].get('wallet_id') for entry in entries],
+            conn=conn
+        )
+        user_pairs = []
+        for entry in entries:
+            txn = entry['transaction']
+            user_pairs.append((txn.get('from_id'), 'sender'))
+            user_pairs.append((txn.get('to_id'), 'receiver'))
+        users_by_bank_id = get_users_by_bank_ids(user_pairs, conn=conn)
+
+        # Seed the signature verifier's key cache from the SEC1 points
+        # stored at registration: these senders' keys now load via
+        # from_encoded_point instead of JWK base64url + on-curve parsing.
+        for user in users_by_bank_id.values():
+            prime_verify_key_cache(
+                user.get('public_key_jwk'), user.get('public_key_sec1')
+            )
+
+        # Process each transaction. Per-txn settle logs are collected and
+        # flushed in one batch INSERT after the loop instead of paying a
+        # round-trip + commit per transaction.
+        pending_logs = []
         for entry in entries:
             txn = entry['transaction']
             txn_id = txn['txn_id']
-            
+
             # Check if already settled
-            if check_transaction_settled(txn_id):
+            if txn_id in already_settled:
                 errors.append(f"Transaction {txn_id} already settled (replay detected)")
                 continue
             
@@ -473,7 +830,7 @@ async def settle_ledger(request: Request):
             wallet_id = txn.get('wallet_id')
             if wallet_id:
                 # Verify wallet exists and is approved
-                wallet = get_wallet(wallet_id)
+                wallet = wallets_by_id.get(wallet_id)
                 if not wallet:
                     errors.append(f"Transaction {txn_id}: Wallet {wallet_id} not found")
                     continue
@@ -490,8 +847,8 @@ async def settle_ledger(request: Request):
                     continue
                 
                 # Get user IDs from bank_ids
-                from_user = get_user_by_bank_id(txn['from_id'], 'sender')
-                to_user = get_user_by_bank_id(txn['to_id'], 'receiver')
+                from_user = users_by_bank_id.get((txn['from_id'], 'sender'))
+                to_user = users_by_bank_id.get((txn['to_id'], 'receiver'))
                 
                 if not from_user:
                     errors.append(f"Transaction {txn_id}: Sender user not found for bank_id {txn['from_id']}")
@@ -500,8 +857,13 @@ async def settle_ledger(request: Request):
                     errors.append(f"Transaction {txn_id}: Receiver user not found for bank_id {txn['to_id']}")
                     continue
                 
-                # Settle transaction and deduct from escrow
+                # Settle transaction and deduct from escrow. Each entry
+                # runs under a savepoint inside the batch transaction, so
+                # one bad entry rolls back alone and the whole ledger
+                # settles with a single commit + fsync instead of N.
                 try:
+                    with conn.cursor() as sp_cur:
+                        sp_cur.execute("SAVEPOINT settle_entry")
                     settlement_id = settle_transaction_to_wallet(
                         txn_id=txn_id,
                         wallet_id=wallet_id,
@@ -509,14 +871,15 @@ async def settle_ledger(request: Request):
                         to_user_id=to_user['user_id'],
                         amount=float(txn['amount']),
                         ledger_index=entry.get('ledger_index'),
-                        receiver_id=receiver_id
+                        receiver_id=receiver_id,
+                        conn=conn
                     )
                     
-                    log_id = write_audit_log(
-                        actor="bank",
-                        action="settle",
-                        status="success",
-                        details={
+                    pending_logs.append({
+                        "actor": "bank",
+                        "action": "settle",
+                        "status": "success",
+                        "details": {
                             "txn_id": txn_id,
                             "wallet_id": wallet_id,
                             "from_id": txn['from_id'],
@@ -526,87 +889,104 @@ async def settle_ledger(request: Request):
                             "ledger_index": entry.get('ledger_index'),
                             "settlement_id": settlement_id
                         },
-                        txn_id=txn_id
-                    )
+                        "txn_id": txn_id
+                    })
                     settled_txn_ids.append(txn_id)
-                    audit_log_ids.append(log_id)
                 except ValueError as settle_err:
+                    with conn.cursor() as sp_cur:
+                        sp_cur.execute("ROLLBACK TO SAVEPOINT settle_entry")
                     errors.append(f"Failed to settle {txn_id}: {str(settle_err)}")
                 except Exception as settle_err:
+                    with conn.cursor() as sp_cur:
+                        sp_cur.execute("ROLLBACK TO SAVEPOINT settle_entry")
                     errors.append(f"Failed to settle {txn_id}: {str(settle_err)}")
             else:
                 # Legacy transaction without wallet_id - still settle but log warning
-                try:
-                    log_id = write_audit_log(
-                        actor="bank",
-                        action="settle",
-                        status="success",
-                        details={
-                            "txn_id": txn_id,
-                            "from_id": txn['from_id'],
-                            "to_id": txn['to_id'],
-                            "amount": txn['amount'],
-                            "receiver_id": receiver_id,
-                            "ledger_index": entry.get('ledger_index'),
-                            "warning": "Legacy transaction without wallet_id"
-                        },
-                        txn_id=txn_id
-                    )
-                    settled_txn_ids.append(txn_id)
-                    audit_log_ids.append(log_id)
-                except Exception as settle_err:
-                    errors.append(f"Failed to settle {txn_id}: {str(settle_err)}")
+                pending_logs.append({
+                    "actor": "bank",
+                    "action": "settle",
+                    "status": "success",
+                    "details": {
+                        "txn_id": txn_id,
+                        "from_id": txn['from_id'],
+                        "to_id": txn['to_id'],
+                        "amount": txn['amount'],
+                        "receiver_id": receiver_id,
+                        "ledger_index": entry.get('ledger_index'),
+                        "warning": "Legacy transaction without wallet_id"
+                    },
+                    "txn_id": txn_id
+                })
+                settled_txn_ids.append(txn_id)
+
+        # Flush the per-transaction settle logs in one round-trip; COPY
+        # beats the multi-row INSERT once batches get into the hundreds.
+        # A log failure must not take the settlements down with it, so the
+        # flush runs under its own savepoint.
+        if pending_logs:
+            try:
+                with conn.cursor() as sp_cur:
+                    sp_cur.execute("SAVEPOINT settle_logs")
+                if len(pending_logs) >= 200:
+                    audit_log_ids.extend(bulk_write_audit_logs(pending_logs, conn=conn))
+                else:
+                    audit_log_ids.extend(write_audit_logs_batch(pending_logs, conn=conn))
+            except Exception as log_err:
+                with conn.cursor() as sp_cur:
+                    sp_cur.execute("ROLLBACK TO SAVEPOINT settle_logs")
+                errors.append(f"Failed to write settlement audit logs: {str(log_err)}")
+
+        # Single commit finalizes every settled entry (and its logs),
+        # then drops cached wallet/user rows the settlements mutated
+        commit_settlement(conn)
         
-        # Write summary log
-        try:
-            write_audit_log(
-                actor="bank",
-                action="settle_ledger_batch",
-                status="success" if len(errors) == 0 else "partial",
-                details={
-                    "receiver_id": receiver_id,
-                    "total_transactions": len(entries),
-                    "settled_count": len(settled_txn_ids),
-                    "errors": errors
-                }
-            )
-        except Exception as summary_err:
-            print(f"Failed to write summary log: {summary_err}")
+        # Write summary log (flushed in the background)
+        queue_audit_log(
+            actor="bank",
+            action="settle_ledger_batch",
+            status="success" if len(errors) == 0 else "partial",
+            details={
+                "receiver_id": receiver_id,
+                "total_transactions": len(entries),
+                "settled_count": len(settled_txn_ids),
+                "errors": errors
+            }
+        )
         
-        return SettlementResponse(
+        return _settlement_response(
             settled=len(settled_txn_ids) > 0,
             settled_transactions=settled_txn_ids,
             errors=errors,
             audit_log_ids=audit_log_ids
         )
-        
+
     except Exception as e:
-        error_msg = f"Settlement error: {str(e)}"
-        try:
-            write_audit_log(
-                actor="bank",
-                action="settle_ledger",
-                status="error",
-                details={"error": error_msg}
-            )
-        except:
-            pass
-        
-        raise HTTPException(status_code=500, detail=error_msg)
+        _settle_ledger_impl_error(f"Settlement error: {str(e)}")
 
 
+# These handlers are plain `def`: they do blocking psycopg2 work, and
+# FastAPI runs sync endpoints on its threadpool automatically - an
+# `async def` body with sync DB calls would stall the event loop for the
+# full round-trip instead.
 @app.get("/bank-logs")
-async def get_bank_logs(limit: int = 100, offset: int = 0):
+def get_bank_logs(limit: int = 100, offset: int = 0, cursor: Optional[str] = None):
     """
     Retrieve bank audit logs from PostgreSQL.
+    Pass the previous page's next_cursor for O(1) deep pagination
+    (offset is ignored when cursor is given). The cursor is composite
+    ("created_at|log_id") so pages that split a same-timestamp batch of
+    settlement logs don't lose the remainder of the batch.
     """
     try:
-        logs = get_audit_logs(limit=limit, offset=offset)
+        logs = get_audit_logs(limit=limit, offset=offset, cursor=cursor)
         return {
             "logs": logs,
             "count": len(logs),
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": (
+                f"{logs[-1]['timestamp']}|{logs[-1]['log_id']}" if logs else None
+            )
         }
     except Exception as e:
         raise HTTPException(
@@ -617,24 +997,23 @@ async def get_bank_logs(limit: int = 100, offset: int = 0):
 
 # KYC Endpoints
 @app.post("/kyc/register", response_model=KYCRegistrationResponse)
-async def register_kyc(request: KYCRegistrationRequest):
+def register_kyc(request: KYCRegistrationRequest):
     """
     Register a new user (sender or receiver) with KYC information.
     Binds user identity to their public key.
     """
     try:
-        if request.role not in ['sender', 'receiver']:
-            raise HTTPException(status_code=400, detail="Role must be 'sender' or 'receiver'")
-        
         user_id = create_user(
             full_name=request.full_name,
             email_or_phone=request.email_or_phone,
             role=request.role,
             bank_id=request.bank_id,
-            public_key_jwk=request.public_key_jwk
+            public_key_jwk=request.public_key_jwk,
+            # Parse the JWK once here; verifiers read the 33-byte point
+            public_key_sec1=jwk_to_compressed_point(request.public_key_jwk)
         )
         
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="kyc_register",
             status="success",
@@ -653,7 +1032,7 @@ async def register_kyc(request: KYCRegistrationRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="kyc_register",
             status="error",
@@ -663,19 +1042,16 @@ async def register_kyc(request: KYCRegistrationRequest):
 
 
 @app.post("/kyc/approve")
-async def approve_kyc(request: KYCApprovalRequest):
+def approve_kyc(request: KYCApprovalRequest):
     """
     Approve or reject a KYC registration.
     """
     try:
-        if request.kyc_status not in ['approved', 'rejected']:
-            raise HTTPException(status_code=400, detail="kyc_status must be 'approved' or 'rejected'")
-        
         updated = update_user_kyc_status(request.user_id, request.kyc_status)
         if not updated:
             raise HTTPException(status_code=404, detail="User not found")
         
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="kyc_approve",
             status="success",
@@ -690,7 +1066,7 @@ async def approve_kyc(request: KYCApprovalRequest):
     except HTTPException:
         raise
     except Exception as e:
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="kyc_approve",
             status="error",
@@ -699,28 +1075,39 @@ async def approve_kyc(request: KYCApprovalRequest):
         raise HTTPException(status_code=500, detail=f"Approval failed: {str(e)}")
 
 
-@app.get("/kyc/users", response_model=List[UserResponse])
-async def list_users(kyc_status: Optional[str] = None):
+@app.get("/kyc/users")
+def list_users(kyc_status: Optional[str] = None, include_wallet: bool = False):
     """
     List all users, optionally filtered by kyc_status.
+    Rows come back from json_agg with exactly the response fields, so
+    they are returned directly instead of re-validating each through
+    UserResponse (Python-level work per row on large registries).
+    include_wallet=1 joins each user's wallet in the same query, saving
+    callers a follow-up /wallets/user/{id} round-trip per row.
     """
     try:
-        users = get_all_users(kyc_status=kyc_status)
-        return [UserResponse(**user) for user in users]
+        if include_wallet:
+            users = get_all_users_with_wallets(kyc_status=kyc_status)
+        else:
+            users = get_all_users(kyc_status=kyc_status)
+        return ORJSONResponse(users)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve users: {str(e)}")
 
 
-@app.get("/kyc/users/{user_id}", response_model=UserResponse)
-async def get_user_info(user_id: str):
+@app.get("/kyc/users/{user_id}")
+def get_user_info(user_id: str):
     """
-    Get user information by user_id.
+    Get user information by user_id. The row already matches the
+    UserResponse contract, so it is returned without re-validation.
     """
     try:
         user = get_user(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        return UserResponse(**user)
+        payload = dict(user)
+        payload.pop('updated_at', None)
+        return ORJSONResponse(payload)
     except HTTPException:
         raise
     except Exception as e:
@@ -729,7 +1116,7 @@ async def get_user_info(user_id: str):
 
 # Wallet Endpoints
 @app.post("/wallets/request", response_model=WalletRequestResponse)
-async def request_wallet(request: WalletRequest):
+def request_wallet(request: WalletRequest):
     """
     Request creation of an offline wallet.
     User must have approved KYC.
@@ -752,7 +1139,7 @@ async def request_wallet(request: WalletRequest):
         
         wallet_id = create_wallet(request.user_id, request.requested_limit)
         
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="wallet_request",
             status="success",
@@ -773,7 +1160,7 @@ async def request_wallet(request: WalletRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="wallet_request",
             status="error",
@@ -783,40 +1170,22 @@ async def request_wallet(request: WalletRequest):
 
 
 @app.post("/wallets/approve")
-async def approve_wallet_request(request: WalletApprovalRequest):
+def approve_wallet_request(request: WalletApprovalRequest):
     """
     Approve a wallet request and lock the escrow amount.
     """
     try:
-        if request.status not in ['approved', 'rejected']:
-            raise HTTPException(status_code=400, detail="status must be 'approved' or 'rejected'")
-        
-        wallet = get_wallet(request.wallet_id)
-        if not wallet:
+        # One atomic UPDATE handles both decisions; a zero-row result is
+        # the not-found case, so the old get_wallet pre-read is gone.
+        updated = set_wallet_decision(
+            request.wallet_id,
+            request.status,
+            request.approved_limit if request.status == 'approved' else None
+        )
+        if not updated:
             raise HTTPException(status_code=404, detail="Wallet not found")
         
-        if request.status == 'approved':
-            updated = approve_wallet(request.wallet_id, request.approved_limit)
-            if not updated:
-                raise HTTPException(status_code=500, detail="Failed to approve wallet")
-        else:
-            # Reject wallet
-            conn = get_db_connection()
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        UPDATE wallets
-                        SET status = 'rejected', updated_at = NOW()
-                        WHERE wallet_id = %s
-                        """,
-                        (request.wallet_id,)
-                    )
-                    conn.commit()
-            finally:
-                conn.close()
-        
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="wallet_approve",
             status="success",
@@ -832,7 +1201,7 @@ async def approve_wallet_request(request: WalletApprovalRequest):
     except HTTPException:
         raise
     except Exception as e:
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="wallet_approve",
             status="error",
@@ -841,32 +1210,34 @@ async def approve_wallet_request(request: WalletApprovalRequest):
         raise HTTPException(status_code=500, detail=f"Wallet approval failed: {str(e)}")
 
 
-@app.get("/wallets/{wallet_id}", response_model=WalletResponse)
-async def get_wallet_info(wallet_id: str):
+@app.get("/wallets/{wallet_id}")
+def get_wallet_info(wallet_id: str):
     """
-    Get wallet information by wallet_id.
+    Get wallet information by wallet_id (row served directly; see
+    _wallet_payload).
     """
     try:
         wallet = get_wallet(wallet_id)
         if not wallet:
             raise HTTPException(status_code=404, detail="Wallet not found")
-        return WalletResponse(**wallet)
+        return ORJSONResponse(_wallet_payload(wallet))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve wallet: {str(e)}")
 
 
-@app.get("/wallets/user/{user_id}", response_model=WalletResponse)
-async def get_wallet_by_user(user_id: str):
+@app.get("/wallets/user/{user_id}")
+def get_wallet_by_user(user_id: str):
     """
-    Get wallet information by user_id.
+    Get wallet information by user_id (row served directly; see
+    _wallet_payload).
     """
     try:
         wallet = get_wallet_by_user_id(user_id)
         if not wallet:
             raise HTTPException(status_code=404, detail="Wallet not found for this user")
-        return WalletResponse(**wallet)
+        return ORJSONResponse(_wallet_payload(wallet))
     except HTTPException:
         raise
     except Exception as e:
@@ -875,24 +1246,23 @@ async def get_wallet_by_user(user_id: str):
 
 # KYC Endpoints
 @app.post("/kyc/register", response_model=KYCRegistrationResponse)
-async def register_kyc(request: KYCRegistrationRequest):
+def register_kyc(request: KYCRegistrationRequest):
     """
     Register a new user (sender or receiver) with KYC information.
     Binds user identity to their public key.
     """
     try:
-        if request.role not in ['sender', 'receiver']:
-            raise HTTPException(status_code=400, detail="Role must be 'sender' or 'receiver'")
-        
         user_id = create_user(
             full_name=request.full_name,
             email_or_phone=request.email_or_phone,
             role=request.role,
             bank_id=request.bank_id,
-            public_key_jwk=request.public_key_jwk
+            public_key_jwk=request.public_key_jwk,
+            # Parse the JWK once here; verifiers read the 33-byte point
+            public_key_sec1=jwk_to_compressed_point(request.public_key_jwk)
         )
         
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="kyc_register",
             status="success",
@@ -911,7 +1281,7 @@ async def register_kyc(request: KYCRegistrationRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="kyc_register",
             status="error",
@@ -921,19 +1291,16 @@ async def register_kyc(request: KYCRegistrationRequest):
 
 
 @app.post("/kyc/approve")
-async def approve_kyc(request: KYCApprovalRequest):
+def approve_kyc(request: KYCApprovalRequest):
     """
     Approve or reject a KYC registration.
     """
     try:
-        if request.kyc_status not in ['approved', 'rejected']:
-            raise HTTPException(status_code=400, detail="kyc_status must be 'approved' or 'rejected'")
-        
         updated = update_user_kyc_status(request.user_id, request.kyc_status)
         if not updated:
             raise HTTPException(status_code=404, detail="User not found")
         
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="kyc_approve",
             status="success",
@@ -948,7 +1315,7 @@ async def approve_kyc(request: KYCApprovalRequest):
     except HTTPException:
         raise
     except Exception as e:
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="kyc_approve",
             status="error",
@@ -957,28 +1324,39 @@ async def approve_kyc(request: KYCApprovalRequest):
         raise HTTPException(status_code=500, detail=f"Approval failed: {str(e)}")
 
 
-@app.get("/kyc/users", response_model=List[UserResponse])
-async def list_users(kyc_status: Optional[str] = None):
+@app.get("/kyc/users")
+def list_users(kyc_status: Optional[str] = None, include_wallet: bool = False):
     """
     List all users, optionally filtered by kyc_status.
+    Rows come back from json_agg with exactly the response fields, so
+    they are returned directly instead of re-validating each through
+    UserResponse (Python-level work per row on large registries).
+    include_wallet=1 joins each user's wallet in the same query, saving
+    callers a follow-up /wallets/user/{id} round-trip per row.
     """
     try:
-        users = get_all_users(kyc_status=kyc_status)
-        return [UserResponse(**user) for user in users]
+        if include_wallet:
+            users = get_all_users_with_wallets(kyc_status=kyc_status)
+        else:
+            users = get_all_users(kyc_status=kyc_status)
+        return ORJSONResponse(users)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve users: {str(e)}")
 
 
-@app.get("/kyc/users/{user_id}", response_model=UserResponse)
-async def get_user_info(user_id: str):
+@app.get("/kyc/users/{user_id}")
+def get_user_info(user_id: str):
     """
-    Get user information by user_id.
+    Get user information by user_id. The row already matches the
+    UserResponse contract, so it is returned without re-validation.
     """
     try:
         user = get_user(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        return UserResponse(**user)
+        payload = dict(user)
+        payload.pop('updated_at', None)
+        return ORJSONResponse(payload)
     except HTTPException:
         raise
     except Exception as e:
@@ -987,7 +1365,7 @@ async def get_user_info(user_id: str):
 
 # Wallet Endpoints
 @app.post("/wallets/request", response_model=WalletRequestResponse)
-async def request_wallet(request: WalletRequest):
+def request_wallet(request: WalletRequest):
     """
     Request creation of an offline wallet.
     User must have approved KYC.
@@ -1010,7 +1388,7 @@ async def request_wallet(request: WalletRequest):
         
         wallet_id = create_wallet(request.user_id, request.requested_limit)
         
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="wallet_request",
             status="success",
@@ -1031,7 +1409,7 @@ async def request_wallet(request: WalletRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="wallet_request",
             status="error",
@@ -1041,40 +1419,22 @@ async def request_wallet(request: WalletRequest):
 
 
 @app.post("/wallets/approve")
-async def approve_wallet_request(request: WalletApprovalRequest):
+def approve_wallet_request(request: WalletApprovalRequest):
     """
     Approve a wallet request and lock the escrow amount.
     """
     try:
-        if request.status not in ['approved', 'rejected']:
-            raise HTTPException(status_code=400, detail="status must be 'approved' or 'rejected'")
-        
-        wallet = get_wallet(request.wallet_id)
-        if not wallet:
+        # One atomic UPDATE handles both decisions; a zero-row result is
+        # the not-found case, so the old get_wallet pre-read is gone.
+        updated = set_wallet_decision(
+            request.wallet_id,
+            request.status,
+            request.approved_limit if request.status == 'approved' else None
+        )
+        if not updated:
             raise HTTPException(status_code=404, detail="Wallet not found")
         
-        if request.status == 'approved':
-            updated = approve_wallet(request.wallet_id, request.approved_limit)
-            if not updated:
-                raise HTTPException(status_code=500, detail="Failed to approve wallet")
-        else:
-            # Reject wallet
-            conn = get_db_connection()
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        UPDATE wallets
-                        SET status = 'rejected', updated_at = NOW()
-                        WHERE wallet_id = %s
-                        """,
-                        (request.wallet_id,)
-                    )
-                    conn.commit()
-            finally:
-                conn.close()
-        
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="wallet_approve",
             status="success",
@@ -1090,7 +1450,7 @@ async def approve_wallet_request(request: WalletApprovalRequest):
     except HTTPException:
         raise
     except Exception as e:
-        write_audit_log(
+        queue_audit_log(
             actor="bank",
             action="wallet_approve",
             status="error",
@@ -1099,40 +1459,128 @@ async def approve_wallet_request(request: WalletApprovalRequest):
         raise HTTPException(status_code=500, detail=f"Wallet approval failed: {str(e)}")
 
 
-@app.get("/wallets/{wallet_id}", response_model=WalletResponse)
-async def get_wallet_info(wallet_id: str):
+@app.get("/wallets/{wallet_id}")
+def get_wallet_info(wallet_id: str):
     """
-    Get wallet information by wallet_id.
+    Get wallet information by wallet_id (row served directly; see
+    _wallet_payload).
     """
     try:
         wallet = get_wallet(wallet_id)
         if not wallet:
             raise HTTPException(status_code=404, detail="Wallet not found")
-        return WalletResponse(**wallet)
+        return ORJSONResponse(_wallet_payload(wallet))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve wallet: {str(e)}")
 
 
-@app.get("/wallets/user/{user_id}", response_model=WalletResponse)
-async def get_wallet_by_user(user_id: str):
+@app.get("/wallets/user/{user_id}")
+def get_wallet_by_user(user_id: str):
     """
-    Get wallet information by user_id.
+    Get wallet information by user_id (row served directly; see
+    _wallet_payload).
     """
     try:
         wallet = get_wallet_by_user_id(user_id)
         if not wallet:
             raise HTTPException(status_code=404, detail="Wallet not found for this user")
-        return WalletResponse(**wallet)
+        return ORJSONResponse(_wallet_payload(wallet))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve wallet: {str(e)}")
 
 
+# Wallet-status push: one dedicated LISTEN connection (outside the pool -
+# a pool slot parked on LISTEN per subscriber would exhaust DB_POOL_MAX
+# with ~10 idle sockets) plus one dispatcher thread fanning NOTIFY events
+# out to per-subscriber asyncio queues. Subscribers block on their queue
+# on the event loop, not on threadpool workers.
+_wallet_subscribers: Dict[str, set] = {}
+_wallet_sub_lock = threading.Lock()
+_wallet_listener_started = False
+
+
+def _wallet_listen_loop(loop):
+    """Daemon thread: forward wallet_status NOTIFYs to subscriber queues."""
+    while True:
+        conn = None
+        try:
+            conn = create_listen_connection('wallet_status')
+            while True:
+                if not select.select([conn], [], [], 15.0)[0]:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    note = conn.notifies.pop(0)
+                    try:
+                        event = json.loads(note.payload)
+                    except ValueError:
+                        continue
+                    with _wallet_sub_lock:
+                        queues = list(_wallet_subscribers.get(event.get('wallet_id'), ()))
+                    for subscriber_queue in queues:
+                        loop.call_soon_threadsafe(subscriber_queue.put_nowait, event)
+        except Exception as listen_err:
+            logger.warning("wallet_status listener error: %s", listen_err)
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            time.sleep(5)
+
+
+def _ensure_wallet_listener():
+    global _wallet_listener_started
+    with _wallet_sub_lock:
+        if _wallet_listener_started:
+            return
+        loop = asyncio.get_running_loop()
+        threading.Thread(
+            target=_wallet_listen_loop, args=(loop,),
+            name="wallet-status-listener", daemon=True
+        ).start()
+        _wallet_listener_started = True
+
+
+@app.websocket("/wallets/subscribe/{wallet_id}")
+async def subscribe_wallet_status(websocket: WebSocket, wallet_id: str):
+    """
+    Push wallet status transitions instead of clients polling
+    /wallets/{wallet_id}. Events come from the shared wallet_status
+    dispatcher (emitted inside set_wallet_decision's transaction); a
+    keepalive every idle interval doubles as the disconnect probe.
+    """
+    await websocket.accept()
+    _ensure_wallet_listener()
+    events: asyncio.Queue = asyncio.Queue()
+    with _wallet_sub_lock:
+        _wallet_subscribers.setdefault(wallet_id, set()).add(events)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=15.0)
+            except asyncio.TimeoutError:
+                # Idle: keepalive, which also surfaces dead clients
+                await websocket.send_json({"event": "keepalive"})
+                continue
+            await websocket.send_json({"event": "status", **event})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        with _wallet_sub_lock:
+            subscribers = _wallet_subscribers.get(wallet_id)
+            if subscribers is not None:
+                subscribers.discard(events)
+                if not subscribers:
+                    _wallet_subscribers.pop(wallet_id, None)
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", "4000"))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(app, host="0.0.0.0", port=port, loop="uvloop", http="httptools")
 
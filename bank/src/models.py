@@ -1,9 +1,15 @@
 """
 Data models for offline payment system.
 Matches the frontend transaction and ledger structures.
+
+These stay Pydantic v2 BaseModels rather than msgspec.Struct: validation
+already runs in compiled pydantic-core, FastAPI's request/response wiring
+understands them natively, and the ledger hot path bypasses model
+construction entirely (see parse_ledger_data), so msgspec would add a
+dependency without touching the measured bottlenecks.
 """
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
 from pydantic import BaseModel, Field
 
 
@@ -77,7 +83,7 @@ class KYCRegistrationRequest(BaseModel):
     """KYC registration request from sender or receiver."""
     full_name: str
     email_or_phone: str
-    role: str  # 'sender' or 'receiver'
+    role: Literal['sender', 'receiver']
     bank_id: str
     public_key_jwk: dict  # ECDSA public key in JWK format
 
@@ -92,7 +98,7 @@ class KYCRegistrationResponse(BaseModel):
 class KYCApprovalRequest(BaseModel):
     """Request to approve/reject KYC."""
     user_id: str
-    kyc_status: str  # 'approved' or 'rejected'
+    kyc_status: Literal['approved', 'rejected']
     notes: Optional[str] = None
 
 
@@ -125,7 +131,7 @@ class WalletApprovalRequest(BaseModel):
     """Request to approve/reject wallet."""
     wallet_id: str
     approved_limit: float
-    status: str  # 'approved' or 'rejected'
+    status: Literal['approved', 'rejected']
     notes: Optional[str] = None
 
 
@@ -10,6 +10,19 @@ CREATE TABLE IF NOT EXISTS audit_logs (
 
 CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at ON audit_logs(created_at DESC);
 
+-- Partial index for the settlement replay check: contains only
+-- settle-success rows, so the per-txn lookup is a single small-index probe
+-- instead of scanning a generic txn_id btree and filtering.
+CREATE INDEX IF NOT EXISTS idx_audit_logs_settled_txn ON audit_logs(txn_id)
+  WHERE action = 'settle' AND status = 'success';
+
+-- Covering index for /bank-logs keyset pagination: key matches the
+-- (created_at DESC, id DESC) page order so the composite cursor seeks
+-- directly; INCLUDEs the small columns to stay index-only (details JSONB
+-- still comes from the heap).
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at_id_covering
+  ON audit_logs(created_at DESC, id DESC) INCLUDE (actor, action, txn_id, status);
+
 -- Users table for KYC registry
 CREATE TABLE IF NOT EXISTS users (
   user_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -18,6 +31,7 @@ CREATE TABLE IF NOT EXISTS users (
   role TEXT NOT NULL CHECK (role IN ('sender', 'receiver')),
   bank_id TEXT NOT NULL,
   public_key_jwk JSONB NOT NULL,
+  public_key_sec1 BYTEA,
   kyc_status TEXT NOT NULL DEFAULT 'pending' CHECK (kyc_status IN ('pending', 'approved', 'rejected')),
   created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
   updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
@@ -25,10 +39,18 @@ CREATE TABLE IF NOT EXISTS users (
   UNIQUE(bank_id, role)
 );
 
+-- Existing databases: compressed SEC1 point precomputed at registration
+ALTER TABLE users ADD COLUMN IF NOT EXISTS public_key_sec1 BYTEA;
+
 CREATE INDEX IF NOT EXISTS idx_users_email_phone ON users(email_or_phone);
 CREATE INDEX IF NOT EXISTS idx_users_bank_id ON users(bank_id);
 CREATE INDEX IF NOT EXISTS idx_users_kyc_status ON users(kyc_status);
 
+-- Covering variant for the filtered user list: serves the UserResponse
+-- columns straight from the index.
+CREATE INDEX IF NOT EXISTS idx_users_kyc_status_covering ON users(kyc_status, created_at DESC)
+  INCLUDE (user_id, full_name, email_or_phone, role, bank_id);
+
 -- Wallets table for pre-funded offline wallets
 CREATE TABLE IF NOT EXISTS wallets (
   wallet_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -46,6 +68,12 @@ CREATE TABLE IF NOT EXISTS wallets (
 CREATE INDEX IF NOT EXISTS idx_wallets_user_id ON wallets(user_id);
 CREATE INDEX IF NOT EXISTS idx_wallets_status ON wallets(status);
 
+-- Covering index for the wallet-by-user lookup (/wallets/user/{id} and the
+-- wallet JOIN on the users list): INCLUDEs the response columns so the scan
+-- is index-only with no heap fetch.
+CREATE INDEX IF NOT EXISTS idx_wallets_user_id_covering ON wallets(user_id)
+  INCLUDE (wallet_id, approved_limit, current_balance, used_amount, locked_amount, status);
+
 -- Settled transactions table
 CREATE TABLE IF NOT EXISTS settled_transactions (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),